@@ -19,16 +19,11 @@ bl_info = {
 
 from enum import IntEnum
 import os
-from pathlib import Path
-import platform
 import sys
-import typing
-from typing import Callable, Optional
+import traceback
 
 import bpy
 from bpy.app.handlers import persistent
-from bpy.props import *
-from bpy.types import Operator, AddonPreferences
 
 
 class SDKSource(IntEnum):
@@ -43,11 +38,57 @@ if "is_running" not in locals():
     last_sdk_path = ""
     last_scripts_path = ""
     sdk_source = SDKSource.PREFS
+    # SDK "start" module (python/start.py), imported by start_sdk()
+    start_module = None
 
 update_error_msg = ''
 
+# Add-on module name, as used for the preferences.addons[...] lookup
+_ADDON_NAME = __package__ or "upbge_nodejs_sdk"
+
+# The add-on directory doesn't change at runtime
+_ADDON_PATH = os.path.dirname(os.path.abspath(__file__))
+_ADDON_PYTHON_PATH = os.path.join(_ADDON_PATH, "python")
+
+
+def _scan_sdk_structure(path: str) -> bool:
+    """Check whether path has the SDK folders, with a single directory read."""
+    try:
+        with os.scandir(path) as entries:
+            found = {entry.name for entry in entries if entry.is_dir()}
+    except OSError:
+        return False
+    return {"python", "runtime"}.issubset(found)
+
+
+# Check only once whether the add-on directory has the SDK structure
+# (python/, runtime/), i.e. it was installed via ZIP
+_ADDON_IS_SDK = _scan_sdk_structure(_ADDON_PATH)
+
+# Memoized os.path.exists() results for SDK path probing, see _cached_exists()
+_exists_cache = {}
+_last_blend_filepath = None
+
+# Whether on_register_post() is waiting in a bpy.app.timers callback
+_register_post_scheduled = False
+
+
+def _cached_exists(path: str) -> bool:
+    """Return os.path.exists(path), memoized until the cache is invalidated."""
+    try:
+        return _exists_cache[path]
+    except KeyError:
+        exists = _exists_cache[path] = os.path.exists(path)
+        return exists
+
+
+def _invalidate_exists_cache():
+    """Forget all memoized filesystem checks (e.g. after loading another blend file)."""
+    _exists_cache.clear()
+
 
 def get_os():
+    import platform
     s = platform.system()
     if s == 'Windows':
         return 'win'
@@ -57,72 +98,118 @@ def get_os():
         return 'linux'
 
 
+def _sdk_path_cache_file() -> str:
+    """Return the path of the on-disk cache for detect_sdk_path() results."""
+    return os.path.join(bpy.utils.user_resource('CONFIG'), "upbge_nodejs_sdk.cache.json")
+
+
+def _read_sdk_path_cache() -> str:
+    """Return the SDK path found by a previous detection, or "" if missing or stale."""
+    import json
+
+    try:
+        with open(_sdk_path_cache_file(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        sdk_path = data["sdk_path"]
+        if data["addon_path"] != _ADDON_PATH or os.path.getmtime(sdk_path) != data["mtime"]:
+            return ""
+        return sdk_path
+    except (OSError, ValueError, KeyError, TypeError):
+        return ""
+
+
+def _write_sdk_path_cache(sdk_path: str):
+    """Remember a detected SDK path so the next startup can skip probing."""
+    import json
+
+    try:
+        data = {
+            "addon_path": _ADDON_PATH,
+            "sdk_path": sdk_path,
+            "mtime": os.path.getmtime(sdk_path),
+        }
+        cache_file = _sdk_path_cache_file()
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        print(f"UPBGE JavaScript SDK: Could not write SDK path cache: {e}")
+
+
 def detect_sdk_path():
     """Auto-detect the SDK path after SDK installation."""
+    from .python.preferences import get_prefs
+
     try:
-        preferences = bpy.context.preferences
-        addon_prefs = preferences.addons["upbge_nodejs_sdk"].preferences
+        addon_prefs = get_prefs(bpy.context)
         if addon_prefs.sdk_path != "":
             return
     except:
         # Context might not be available, try to get preferences differently
         try:
-            addon_prefs = bpy.context.preferences.addons.get("upbge_nodejs_sdk")
+            addon_prefs = bpy.context.preferences.addons.get(_ADDON_NAME)
             if addon_prefs and addon_prefs.preferences.sdk_path != "":
                 return
         except:
             pass
 
     # When installed via ZIP, the add-on directory IS the SDK directory
-    addon_path = os.path.dirname(os.path.abspath(__file__))
-    
     # Check if this add-on directory has the SDK structure (python/, runtime/)
-    has_python = os.path.exists(os.path.join(addon_path, "python"))
-    has_runtime = os.path.exists(os.path.join(addon_path, "runtime"))
-    
-    if has_python and has_runtime:
+    if _ADDON_IS_SDK:
         # This is the SDK itself (installed via ZIP)
         try:
-            preferences = bpy.context.preferences
-            addon_prefs = preferences.addons["upbge_nodejs_sdk"].preferences
-            addon_prefs.sdk_path = addon_path
-            print(f"UPBGE JavaScript SDK: Auto-detected SDK path: {addon_path}")
+            addon_prefs = get_prefs(bpy.context)
+            addon_prefs.sdk_path = _ADDON_PATH
+            print(f"UPBGE JavaScript SDK: Auto-detected SDK path: {_ADDON_PATH}")
             return
         except Exception as e:
             print(f"UPBGE JavaScript SDK: Could not set SDK path automatically: {e}")
     
-    # Try to detect from addon location (for development)
-    possible_paths = [
-        os.path.join(addon_path, "..", "bge_js_sdk"),
-        os.path.join(addon_path, "bge_js_sdk"),
-        os.path.join(addon_path, "..", "upbge-javascript"),  # Development path
-        os.path.join(addon_path, "..", "upbge-nodejs-sdk"),  # Development path
-    ]
+    # Reuse the result of a previous detection while that SDK directory is unchanged
+    cached_sdk_path = _read_sdk_path_cache()
+    if cached_sdk_path:
+        try:
+            addon_prefs = get_prefs(bpy.context)
+            addon_prefs.sdk_path = cached_sdk_path
+            print(f"UPBGE JavaScript SDK: Auto-detected SDK path (cached): {cached_sdk_path}")
+            return
+        except Exception as e:
+            print(f"UPBGE JavaScript SDK: Could not set SDK path automatically: {e}")
+
+    # Try to detect from addon location (for development), first match wins
+    possible_paths = (
+        os.path.join(_ADDON_PATH, "..", "bge_js_sdk"),
+        os.path.join(_ADDON_PATH, "bge_js_sdk"),
+        os.path.join(_ADDON_PATH, "..", "upbge-javascript"),  # Development path
+        os.path.join(_ADDON_PATH, "..", "upbge-nodejs-sdk"),  # Development path
+    )
     
     for path in possible_paths:
-        abs_path = os.path.abspath(path)
-        if os.path.exists(abs_path) and os.path.exists(os.path.join(abs_path, "python")):
-            try:
-                preferences = bpy.context.preferences
-                addon_prefs = preferences.addons["upbge_nodejs_sdk"].preferences
-                addon_prefs.sdk_path = abs_path
-                print(f"UPBGE JavaScript SDK: Auto-detected SDK path: {abs_path}")
-                return
-            except Exception as e:
-                print(f"UPBGE JavaScript SDK: Could not set SDK path automatically: {e}")
+        # _ADDON_PATH is already absolute, normpath is enough (no getcwd)
+        abs_path = os.path.normpath(path)
+        # isdir() on python/ also implies the candidate directory exists
+        if not os.path.isdir(os.path.join(abs_path, "python")):
+            continue
+        try:
+            addon_prefs = get_prefs(bpy.context)
+            addon_prefs.sdk_path = abs_path
+            print(f"UPBGE JavaScript SDK: Auto-detected SDK path: {abs_path}")
+            _write_sdk_path_cache(abs_path)
+        except Exception as e:
+            print(f"UPBGE JavaScript SDK: Could not set SDK path automatically: {e}")
+        return
 
 
 def get_fp():
-    if bpy.data.filepath == '':
-        return ''
-    s = bpy.data.filepath.split(os.path.sep)
-    s.pop()
-    return os.path.sep.join(s)
+    return os.path.dirname(bpy.data.filepath)
 
 
 def same_path(path1: str, path2: str) -> bool:
     """Compare whether two paths point to the same location."""
-    if os.path.exists(path1) and os.path.exists(path2):
+    if path1 == path2:
+        return True
+
+    if _cached_exists(path1) and _cached_exists(path2):
         return os.path.samefile(path1, path2)
 
     p1 = os.path.realpath(os.path.normpath(os.path.normcase(path1)))
@@ -142,37 +229,31 @@ def get_sdk_path(context: bpy.context) -> str:
     global sdk_source
 
     sdk_envvar = os.environ.get('BGE_JAVASCRIPT_SDK')
-    if sdk_envvar is not None and os.path.isabs(sdk_envvar) and os.path.isdir(sdk_envvar) and os.path.exists(sdk_envvar):
+    if sdk_envvar is not None and os.path.isabs(sdk_envvar) and os.path.isdir(sdk_envvar) and _cached_exists(sdk_envvar):
         sdk_source = SDKSource.ENV_VAR
         return sdk_envvar
 
     fp = get_fp()
     if fp != '':  # blend file is saved
         local_sdk = os.path.join(fp, 'bge_js_sdk')
-        if os.path.exists(local_sdk):
+        if _cached_exists(local_sdk):
             sdk_source = SDKSource.LOCAL
             return local_sdk
 
     sdk_source = SDKSource.PREFS
-    preferences = context.preferences
-    addon_prefs = preferences.addons["upbge_nodejs_sdk"].preferences
+    from .python.preferences import get_prefs
+    addon_prefs = get_prefs(context)
     
     # If SDK path is set in preferences, use it
     if addon_prefs.sdk_path:
         return addon_prefs.sdk_path
     
     # Auto-detect: check if add-on directory itself is the SDK (when installed via ZIP)
-    addon_path = os.path.dirname(os.path.abspath(__file__))
-    has_sdk_structure = (
-        os.path.exists(os.path.join(addon_path, "python")) and
-        os.path.exists(os.path.join(addon_path, "runtime"))
-    )
-    
-    if has_sdk_structure:
+    if _ADDON_IS_SDK:
         # Auto-set the SDK path to the add-on directory
-        addon_prefs.sdk_path = addon_path
-        print(f"UPBGE JavaScript SDK: Auto-detected SDK path (add-on directory): {addon_path}")
-        return addon_path
+        addon_prefs.sdk_path = _ADDON_PATH
+        print(f"UPBGE JavaScript SDK: Auto-detected SDK path (add-on directory): {_ADDON_PATH}")
+        return _ADDON_PATH
     
     return ""
 
@@ -182,25 +263,25 @@ def start_sdk(sdk_path: str):
     global is_running
     global last_scripts_path
     global last_sdk_path
+    global start_module
 
     if sdk_path == "":
         return
 
     # Check if SDK path exists
-    if not os.path.exists(sdk_path):
+    if not _cached_exists(sdk_path):
         print(f"UPBGE JavaScript SDK load error: SDK path does not exist: {sdk_path}")
         return
 
     python_path = os.path.join(sdk_path, "python")
-    if not os.path.exists(python_path):
+    if not _cached_exists(python_path):
         # If python folder doesn't exist, use the addon's python folder
         # This allows the SDK to work even if installed as addon
-        addon_path = os.path.dirname(os.path.abspath(__file__))
-        python_path = os.path.join(addon_path, "python")
-        if not os.path.exists(python_path):
+        python_path = _ADDON_PYTHON_PATH
+        if not _cached_exists(python_path):
             print("UPBGE JavaScript SDK load error: 'python' folder not found.")
             print(f"  SDK path: {sdk_path}")
-            print(f"  Addon path: {addon_path}")
+            print(f"  Addon path: {_ADDON_PATH}")
             print("  Please make sure the SDK is properly installed or configure SDK path in preferences.")
             return
 
@@ -210,14 +291,16 @@ def start_sdk(sdk_path: str):
 
     # Import and register SDK modules
     try:
-        # Import start module from SDK path
-        import start
-        if last_sdk_path != "":
-            import importlib
-            start = importlib.reload(start)
+        import importlib
+
+        # Import start module from SDK path, reloading it only when the SDK moved
+        if start_module is None:
+            start_module = importlib.import_module("start")
+        elif last_sdk_path and not same_path(last_sdk_path, sdk_path):
+            start_module = importlib.reload(start_module)
         
         use_local_sdk = (sdk_source == SDKSource.LOCAL)
-        start.register(local_sdk=use_local_sdk)
+        start_module.register(local_sdk=use_local_sdk)
         
         last_sdk_path = sdk_path
         is_running = True
@@ -226,7 +309,6 @@ def start_sdk(sdk_path: str):
     except ImportError as e:
         print(f"Failed to import SDK modules: {e}")
         print("Make sure the SDK is properly installed.")
-        import traceback
         traceback.print_exc()
 
 
@@ -237,11 +319,8 @@ def stop_sdk():
     if not is_running:
         return
 
-    try:
-        import start
-        start.unregister()
-    except ImportError:
-        pass
+    if start_module is not None:
+        start_module.unregister()
 
     if last_scripts_path and last_scripts_path in sys.path:
         sys.path.remove(last_scripts_path)
@@ -250,8 +329,17 @@ def stop_sdk():
 
 def restart_sdk(context):
     """Restart the SDK when path changes."""
+    global _last_blend_filepath
+
+    # A different blend file may have a local ./bge_js_sdk next to it
+    if bpy.data.filepath != _last_blend_filepath:
+        _last_blend_filepath = bpy.data.filepath
+        _invalidate_exists_cache()
+
     old_sdk_source = sdk_source
     sdk_path = get_sdk_path(context)
+    if sdk_source != old_sdk_source:
+        _invalidate_exists_cache()
 
     if sdk_path == "":
         if not is_running:
@@ -261,6 +349,10 @@ def restart_sdk(context):
         stop_sdk()
         return
 
+    # Fast path: nothing changed, skip the filesystem-based path comparison
+    if is_running and sdk_source == old_sdk_source and last_sdk_path == sdk_path:
+        return
+
     # Only restart SDK when the path changed or it isn't running
     if not same_path(last_sdk_path, sdk_path) or sdk_source != old_sdk_source or not is_running:
         stop_sdk()
@@ -271,70 +363,96 @@ def restart_sdk(context):
 @persistent
 def on_load_post(context):
     """Handler called after loading a blend file."""
+    from .python.preferences import invalidate_prefs_cache
+
+    invalidate_prefs_cache()
+    # Also on reload/revert of the same file: ./bge_js_sdk may have appeared next to it
+    _invalidate_exists_cache()
     restart_sdk(bpy.context)
 
 
 def on_register_post():
     """Handler called after addon registration."""
+    global _register_post_scheduled
+    _register_post_scheduled = False
+
     try:
         print("UPBGE JavaScript SDK: Running auto-detection...")
         detect_sdk_path()
         
         # Try to get SDK path to verify
         try:
-            preferences = bpy.context.preferences
-            addon_prefs = preferences.addons["upbge_nodejs_sdk"].preferences
+            from .python.preferences import get_prefs
+            addon_prefs = get_prefs(bpy.context)
             if addon_prefs.sdk_path:
                 print(f"UPBGE JavaScript SDK: SDK path is set to: {addon_prefs.sdk_path}")
             else:
                 print("UPBGE JavaScript SDK: WARNING - SDK path is still empty after auto-detection")
-                print(f"  Add-on path: {os.path.dirname(os.path.abspath(__file__))}")
+                print(f"  Add-on path: {_ADDON_PATH}")
         except Exception as e:
             print(f"UPBGE JavaScript SDK: Could not verify SDK path: {e}")
         
         restart_sdk(bpy.context)
     except Exception as e:
         print(f"UPBGE JavaScript SDK: Error in on_register_post: {e}")
-        import traceback
         traceback.print_exc()
 
 
+def _get_classes():
+    """Import the preferences/operators modules on demand and return their classes."""
+    from .python import preferences, operators
+
+    return (
+        preferences.SDKAddonPreferences,
+        operators.SDK_INSTALL_OT_operator,
+        operators.SDK_UPDATE_OT_operator,
+        operators.SDK_RESTORE_OT_operator,
+        operators.SDK_CLEAR_COMPILE_CACHE_OT_operator,
+        operators.SDK_OPEN_IN_EDITOR_OT_operator,
+    )
+
+
 def register():
     """Register the add-on."""
+    global _register_post_scheduled
+
     try:
-        from .python import preferences, operators
-        
-        bpy.utils.register_class(preferences.SDKAddonPreferences)
-        bpy.utils.register_class(operators.SDK_INSTALL_OT_operator)
-        bpy.utils.register_class(operators.SDK_UPDATE_OT_operator)
-        bpy.utils.register_class(operators.SDK_RESTORE_OT_operator)
-        bpy.utils.register_class(operators.SDK_OPEN_IN_EDITOR_OT_operator)
+        # The AddonPreferences class must be registered here (not in the timer)
+        # so Blender can restore the stored preferences for this add-on.
+        for cls in _get_classes():
+            bpy.utils.register_class(cls)
         bpy.app.handlers.load_post.append(on_load_post)
 
-        # Hack to avoid _RestrictContext
-        # Use a longer delay to ensure preferences are loaded
-        bpy.app.timers.register(on_register_post, first_interval=0.1)
+        # register() always runs under RestrictBlend (bpy.data and the context
+        # are restricted), so defer the SDK startup to a timer
+        if not _register_post_scheduled:
+            _register_post_scheduled = True
+            # Use a longer delay to ensure preferences are loaded
+            bpy.app.timers.register(on_register_post, first_interval=0.1)
         
         print("UPBGE Node.js SDK: Add-on registered")
     except ImportError as e:
         print(f"UPBGE Node.js SDK: Failed to import SDK modules: {e}")
-        import traceback
         traceback.print_exc()
         print("Make sure the SDK is properly installed.")
 
 
 def unregister():
     """Unregister the add-on."""
+    global _register_post_scheduled
+
+    if _register_post_scheduled and bpy.app.timers.is_registered(on_register_post):
+        bpy.app.timers.unregister(on_register_post)
+    _register_post_scheduled = False
+
     stop_sdk()
     
     try:
-        from .python import preferences, operators
-        
-        bpy.utils.unregister_class(preferences.SDKAddonPreferences)
-        bpy.utils.unregister_class(operators.SDK_INSTALL_OT_operator)
-        bpy.utils.unregister_class(operators.SDK_UPDATE_OT_operator)
-        bpy.utils.unregister_class(operators.SDK_RESTORE_OT_operator)
-        bpy.utils.unregister_class(operators.SDK_OPEN_IN_EDITOR_OT_operator)
+        from .python import preferences
+        preferences.invalidate_prefs_cache()
+        preferences.cancel_pending_restart()
+        for cls in reversed(_get_classes()):
+            bpy.utils.unregister_class(cls)
         bpy.app.handlers.load_post.remove(on_load_post)
     except ImportError:
         pass
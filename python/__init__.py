@@ -4,6 +4,15 @@
 
 """UPBGE JavaScript SDK Python modules."""
 
+# Not an add-on. This package and its subpackages each define a minimal bl_info
+# so Blender's add-on scanner doesn't fall back to a full (slow) parse of the
+# file if one of these directories ever ends up on an add-on path.
+bl_info = {
+    "name": "UPBGE Node.js SDK Modules (internal)",
+    "blender": (5, 0, 0),
+    "category": "",
+}
+
 __all__ = (
     "preferences",
     "operators",
@@ -22,9 +22,16 @@ language_id = "javascript"
 PROMPT = '>>> '
 PROMPT_MULTI = '... '
 
+# Line endings that suggest the statement continues on the next line
+_CONT_SINGLE = frozenset("{[(,?:=+-*/%")
+_CONT_MULTI = ("&&", "||", "\\")
+
 # Global runtime instance
 _runtime = None
 
+# (node_path, version) of the last `node --version` probe, see banner()
+_node_version_cache = None
+
 
 def get_runtime():
     """Get or create Node.js runtime instance."""
@@ -34,6 +41,30 @@ def get_runtime():
     return _runtime
 
 
+def reset_node_version_cache():
+    """Forget the cached Node.js version (e.g. when the SDK is restarted)."""
+    global _node_version_cache
+    _node_version_cache = None
+
+
+def get_node_version(node_path):
+    """Return the `node --version` string for node_path, probing it only once."""
+    global _node_version_cache
+    if _node_version_cache is not None and _node_version_cache[0] == node_path:
+        return _node_version_cache[1]
+
+    node_version = "Unknown"
+    try:
+        import subprocess
+        result = subprocess.run([node_path, "--version"], capture_output=True, text=True, timeout=2)
+        if result.returncode == 0:
+            node_version = result.stdout.strip()
+            _node_version_cache = (node_path, node_version)
+    except:
+        pass
+    return node_version
+
+
 def add_scrollback(text, text_type):
     for line in text.split("\n"):
         bpy.ops.console.scrollback_append(
@@ -42,6 +73,13 @@ def add_scrollback(text, text_type):
         )
 
 
+# Console states of the current window manager. Blender structs can't be
+# weak-referenced, so the states are dropped when the window manager pointer
+# changes (e.g. another blend file was loaded)
+_consoles = {}
+_consoles_owner = None
+
+
 def get_console(console_id):
     """
     Helper function for console operators.
@@ -49,33 +87,22 @@ def get_console(console_id):
     
     console_id can be any hashable type
     """
-    consoles = getattr(get_console, "consoles", None)
-    hash_next = hash(bpy.context.window_manager)
-
-    if consoles is None:
-        consoles = get_console.consoles = {}
-        get_console.consoles_namespace_hash = hash_next
-    else:
-        # Check if clearing the namespace is needed to avoid a memory leak
-        hash_prev = getattr(get_console, "consoles_namespace_hash", 0)
-        if hash_prev != hash_next:
-            get_console.consoles_namespace_hash = hash_next
-            consoles.clear()
-
-    console_data = consoles.get(console_id)
-    
-    if console_data:
-        # Return existing console data (accumulated code, etc.)
-        return console_data
-    else:
+    global _consoles_owner
+
+    owner = bpy.context.window_manager.as_pointer()
+    if owner != _consoles_owner:
+        _consoles.clear()
+        _consoles_owner = owner
+
+    console_state = _consoles.get(console_id)
+    if console_state is None:
         # Create new console context
         # Store accumulated code and state
-        console_state = {
+        console_state = _consoles[console_id] = {
             "accumulated_code": "",
             "is_multiline": False,
         }
-        consoles[console_id] = console_state
-        return console_state
+    return console_state
 
 
 def execute_javascript(code, is_multiline=False, context_id=None):
@@ -120,13 +147,7 @@ def execute(context, is_interactive):
         
         # Check if line ends with certain characters that suggest continuation
         stripped = line.rstrip()
-        if stripped.endswith(("{", "[", "(", ",", "&&", "||", "?", ":", "=", "+", "-", "*", "/", "%")):
-            is_multiline = True
-        elif stripped.endswith("\\"):
-            is_multiline = True
-        else:
-            # Try to execute and see if it's valid
-            is_multiline = False
+        is_multiline = stripped[-1:] in _CONT_SINGLE or stripped.endswith(_CONT_MULTI)
         
         console_state["is_multiline"] = is_multiline
         
@@ -134,7 +155,7 @@ def execute(context, is_interactive):
             sc.prompt = PROMPT_MULTI
             # Insert a new blank line with indentation
             indent = line[:len(line) - len(line.lstrip())]
-            if line.rstrip().endswith("{"):
+            if stripped.endswith("{"):
                 indent += "  "  # 2 spaces for JS
             bpy.ops.console.history_append(text=indent, current_character=0, remove_duplicates=True)
             sc.history[-1].current_character = len(indent)
@@ -208,21 +229,20 @@ def copy_as_script(context):
         "",
     ]
 
-    for line in sc.scrollback:
-        text = line.body
-        type = line.type
+    for line in list(sc.scrollback):
+        text, type_ = line.body, line.type
 
-        if type == 'INFO':  # Ignore auto-completion.
+        if type_ == 'INFO':  # Ignore auto-completion.
             continue
-        if type == 'INPUT':
+        if type_ == 'INPUT':
             if text.startswith(PROMPT):
-                text = text[len(PROMPT):]
-            elif text.startswith(PROMPT_MULTI):
-                text = text[len(PROMPT_MULTI):]
-        elif type == 'OUTPUT':
-            text = "//~ " + text
-        elif type == 'ERROR':
-            text = "//! " + text
+                text = text.removeprefix(PROMPT)
+            else:
+                text = text.removeprefix(PROMPT_MULTI)
+        elif type_ == 'OUTPUT':
+            text = f"//~ {text}"
+        elif type_ == 'ERROR':
+            text = f"//! {text}"
 
         lines.append(text)
 
@@ -240,13 +260,7 @@ def banner(context):
     node_path = runtime.get_node_path()
     
     if node_path:
-        try:
-            import subprocess
-            result = subprocess.run([node_path, "--version"], capture_output=True, text=True, timeout=2)
-            if result.returncode == 0:
-                node_version = result.stdout.strip()
-        except:
-            pass
+        node_version = get_node_version(node_path)
     
     message = (
         f"JAVASCRIPT INTERACTIVE CONSOLE {node_version}",
@@ -12,7 +12,16 @@ import bpy
 # This file will be dynamically generated and injected into text blocks
 # when a .js file is assigned to a Python controller
 
-WRAPPER_CODE_TEMPLATE = """# Auto-generated wrapper for JavaScript execution
+# One wrapper text is shared by every JS controller; each controller's script
+# name is kept in a game property on its owner (prefix + controller name)
+GENERIC_WRAPPER_NAME = "__js_wrapper_generic__"
+SCRIPT_PROPERTY_PREFIX = "_js_script_"
+# Game property names are limited to 63 characters
+_MAX_PROPERTY_NAME = 63
+
+# Wrapper code is assembled by plain concatenation:
+# _WRAPPER_HEADER + SCRIPT_NAME lookup + _WRAPPER_BODY
+_WRAPPER_HEADER = """# Auto-generated wrapper for JavaScript execution
 # This script intercepts .js files and executes them via Node.js
 
 import bpy
@@ -24,474 +33,419 @@ try:
 except Exception:
     bge = None
 
-# Script name to execute (will be replaced)
-SCRIPT_NAME = "{script_name}"
+# Input status values reported to JS in sensor "events"
+_KX_ACTIVE = int(getattr(bge.logic, "KX_INPUT_ACTIVE", 1)) if bge is not None else 1
+_KX_JUST_ACTIVATED = int(getattr(bge.logic, "KX_INPUT_JUST_ACTIVATED", 2)) if bge is not None else 2
+_KX_JUST_RELEASED = int(getattr(bge.logic, "KX_INPUT_JUST_RELEASED", 3)) if bge is not None else 3
+# W, S, A, D (upper and lower case) probed via getKeyStatus when inputs is empty
+_WASD_KEYCODES = (87, 83, 65, 68, 119, 115, 97, 100)
+
+# Object names are interned so each frame's name strings collapse onto the
+# same objects instead of piling up as fresh copies
+_intern = sys.intern
+
+# Decimals kept for floats sent to JS (shorter JSON; 0.1 mm / 0.0001 rad resolution)
+_FLOAT_DIGITS = 4
+
+# The SDK's script handler: after the first tick it is in sys.modules, so this
+# is a dict lookup rather than a trip through the import machinery. The copy
+# start.py registers (game_engine.script_handler) comes first: it owns the
+# warmed-up Node worker that unregister() and the atexit hook stop.
+_script_handler = (
+    sys.modules.get("game_engine.script_handler")
+    or sys.modules.get("upbge_nodejs_sdk.python.game_engine.script_handler")
+    or sys.modules.get("python.game_engine.script_handler")
+)
 
+"""
+
+_WRAPPER_SCRIPT_NAME = f"""# Script name to execute (game property set when the wrapper was assigned)
+SCRIPT_NAME = None
+SCRIPT_PROPERTY = None
+if bge is not None:
+    try:
+        _cont = bge.logic.getCurrentController()
+        SCRIPT_PROPERTY = ({SCRIPT_PROPERTY_PREFIX!r} + _cont.name)[:{_MAX_PROPERTY_NAME}]
+        SCRIPT_NAME = _cont.owner.get(SCRIPT_PROPERTY)
+    except Exception:
+        SCRIPT_NAME = None
+"""
 
-def _build_context():
+_WRAPPER_BODY = """
+
+def _build_context(keys=None):
     \"\"\"Build rich context for the JS runtime bridge.
 
     Returns a dict that will be serialized to JSON and made available in JS as
-    __BGE_CONTEXT__.
+    __BGE_CONTEXT__. ``keys`` is the script's "// @bge-context:" allowlist; the
+    scene-wide snapshots are skipped unless it is None or lists them.
     \"\"\"
-    ctx = {{
-        "scene_name": "",
-        "object_name": "",
-        "position": None,
-        "rotation": None,
-        "scale": None,
-        "parent_name": None,
-        "properties": None,
-        "children": None,
-        "object_positions": None,
-        "scenes": None,
-        "windowWidth": None,
-        "windowHeight": None,
-        "active_camera_name": None,
-        "keyboard": None,
-        "mouse": None,
-        "joystick": None,
-        "engine": None,
-        "controller_name": "",
-        "actuators": None,
-        "sensors": None,
-        "rayCastResults": None,
-    }}
+    # Only populated keys are sent; the JS shim treats a missing key like null.
+    ctx = {}
 
-    try:
-        if bge is not None:
-            logic = bge.logic  # type: ignore[attr-defined]
-            controller = logic.getCurrentController()
-            owner = controller.owner if controller else None
+    if bge is None:
+        return ctx
 
-            # Controller metadata and actuators list
-            try:
-                if controller is not None:
-                    ctx["controller_name"] = controller.name
-                    ctx["actuators"] = [getattr(a, "name", str(i)) for i, a in enumerate(getattr(controller, "actuators", []))]
-            except Exception:
-                pass
-
-            # Scene / object basic info
-            if owner is not None:
-                ctx["object_name"] = owner.name
-                try:
-                    ctx["scene_name"] = owner.scene.name
-                except Exception:
-                    try:
-                        ctx["scene_name"] = owner.scene.name
-                    except Exception:
-                        ctx["scene_name"] = ""
-                try:
-                    # worldPosition is a Vector-like, convert to plain list
-                    pos = getattr(owner, "worldPosition", None)
-                    if pos is not None:
-                        ctx["position"] = [float(pos[0]), float(pos[1]), float(pos[2])]
-                except Exception:
-                    ctx["position"] = None
-
-                # worldOrientation: Euler [x,y,z] in radians (BGE uses radians)
-                try:
-                    orient = getattr(owner, "worldOrientation", None)
-                    if orient is not None:
-                        euler = getattr(orient, "to_euler", None)
-                        if euler is not None and callable(euler):
-                            e = euler()
-                            ctx["rotation"] = [float(e[0]), float(e[1]), float(e[2])]
-                        else:
-                            ctx["rotation"] = None
-                    else:
-                        ctx["rotation"] = None
-                except Exception:
-                    ctx["rotation"] = None
-
-                # worldScale
-                try:
-                    scl = getattr(owner, "worldScale", None)
-                    if scl is not None:
-                        ctx["scale"] = [float(scl[0]), float(scl[1]), float(scl[2])]
-                    else:
-                        ctx["scale"] = None
-                except Exception:
-                    ctx["scale"] = None
-
-                # parent name
-                try:
-                    parent = getattr(owner, "parent", None)
-                    ctx["parent_name"] = parent.name if parent is not None else None
-                except Exception:
-                    ctx["parent_name"] = None
-
-                # Object properties
-                try:
-                    props = {{}}
-                    for key in owner.keys():
-                        try:
-                            props[key] = owner[key]
-                        except Exception:
-                            continue
-                    ctx["properties"] = props
-                except Exception:
-                    ctx["properties"] = None
-
-                # Children (names only)
-                try:
-                    children = getattr(owner, "children", None)
-                    if children is not None:
-                        ctx["children"] = [child.name for child in children]
-                except Exception:
-                    ctx["children"] = None
-
-                # Object positions in current scene (for camera follow, etc.)
-                try:
-                    scene = getattr(owner, "scene", None)
-                    if scene is not None:
-                        obj_positions = {{}}
-                        for obj in getattr(scene, "objects", []):
-                            try:
-                                pos = getattr(obj, "worldPosition", None)
-                                if pos is not None:
-                                    obj_positions[obj.name] = [float(pos[0]), float(pos[1]), float(pos[2])]
-                            except Exception:
-                                continue
-                        ctx["object_positions"] = obj_positions
-                    else:
-                        ctx["object_positions"] = None
-                except Exception:
-                    ctx["object_positions"] = None
+    # One guard per section: BGE attribute reads don't raise during normal play,
+    # so a failure only drops the rest of that section.
+    try:
+        logic = bge.logic  # type: ignore[attr-defined]
+        controller = logic.getCurrentController()
+        owner = controller.owner if controller else None
+    except Exception:
+        return ctx
+    scene = None
+    # Scene-wide snapshots are shared by every JS controller within one logic
+    # frame; None (no getFrameTime in this build) disables that sharing.
+    try:
+        frame_key = logic.getFrameTime()
+    except Exception:
+        frame_key = None
 
-            # Viewport and active camera (current scene)
+    # Controller metadata, scene / object basic info
+    try:
+        if controller is not None:
+            ctx["controller_name"] = controller.name
+            ctx["actuators"] = [getattr(a, "name", str(i)) for i, a in enumerate(getattr(controller, "actuators", ()))]
+
+        if owner is not None:
+            ctx["object_name"] = owner.name
+            scene = getattr(owner, "scene", None)
+            ctx["scene_name"] = getattr(scene, "name", "")
+
+            # worldPosition is a Vector-like; a plain tuple serializes as a JSON array
+            pos = getattr(owner, "worldPosition", None)
+            if pos is not None:
+                ctx["position"] = (round(pos[0], _FLOAT_DIGITS), round(pos[1], _FLOAT_DIGITS), round(pos[2], _FLOAT_DIGITS))
+
+            # worldOrientation: Euler [x,y,z] in radians (BGE uses radians)
+            to_euler = getattr(getattr(owner, "worldOrientation", None), "to_euler", None)
+            if to_euler is not None:
+                e = to_euler()
+                ctx["rotation"] = (round(e[0], _FLOAT_DIGITS), round(e[1], _FLOAT_DIGITS), round(e[2], _FLOAT_DIGITS))
+
+            scl = getattr(owner, "worldScale", None)
+            if scl is not None:
+                ctx["scale"] = (round(scl[0], _FLOAT_DIGITS), round(scl[1], _FLOAT_DIGITS), round(scl[2], _FLOAT_DIGITS))
+
+            parent = getattr(owner, "parent", None)
+            if parent is not None:
+                ctx["parent_name"] = parent.name
+
+            # Object properties: one comprehension, per-key retry only if a read fails.
+            # The wrapper's own script-name properties are not shown to JS.
+            get_names = getattr(owner, "getPropertyNames", None)
+            prop_names = [
+                name for name in (get_names() if get_names is not None else owner.keys())
+                if not name.startswith("_js_script_")
+            ]
             try:
-                try:
-                    render = getattr(bge, "render", None)
-                    if render is not None:
-                        ctx["windowWidth"] = int(getattr(render, "getWindowWidth", lambda: 0)())
-                        ctx["windowHeight"] = int(getattr(render, "getWindowHeight", lambda: 0)())
-                except Exception:
-                    ctx["windowWidth"] = None
-                    ctx["windowHeight"] = None
-                try:
-                    scene = getattr(owner, "scene", None)
-                    if scene is not None:
-                        ac = getattr(scene, "active_camera", None)
-                        ctx["active_camera_name"] = ac.name if ac is not None else None
-                    else:
-                        ctx["active_camera_name"] = None
-                except Exception:
-                    ctx["active_camera_name"] = None
+                props = {name: owner[name] for name in prop_names}
             except Exception:
-                pass
-
-            # Scene list snapshot
-            try:
-                scenes_data = []
-                try:
-                    scene_list = list(logic.getSceneList())
-                except Exception:
-                    scene_list = []
-
-                for sc in scene_list:
+                props = {}
+                for name in prop_names:
                     try:
-                        scenes_data.append(
-                            {{
-                                "name": getattr(sc, "name", ""),
-                                "objects": [obj.name for obj in getattr(sc, "objects", [])],
-                            }}
-                        )
+                        props[name] = owner[name]
                     except Exception:
                         continue
+            ctx["properties"] = props
+
+            # Children (names only)
+            children = getattr(owner, "children", None)
+            if children is not None:
+                ctx["children"] = [_intern(child.name) for child in children]
+
+            # Object positions in current scene (for camera follow, etc.)
+            if scene is not None and (keys is None or "object_positions" in keys):
+                snapshot_name = ("object_positions", ctx["scene_name"])
+                obj_positions = _script_handler.get_frame_snapshot(snapshot_name, frame_key)
+                if obj_positions is None:
+                    obj_positions = {}
+                    for obj in getattr(scene, "objects", ()):
+                        pos = getattr(obj, "worldPosition", None)
+                        if pos is not None:
+                            obj_positions[_intern(obj.name)] = (round(pos[0], _FLOAT_DIGITS), round(pos[1], _FLOAT_DIGITS), round(pos[2], _FLOAT_DIGITS))
+                    _script_handler.set_frame_snapshot(snapshot_name, frame_key, obj_positions)
+                ctx["object_positions"] = obj_positions
+    except Exception:
+        pass
 
-                if scenes_data:
-                    ctx["scenes"] = scenes_data
-            except Exception:
-                ctx["scenes"] = None
-
-            # Engine info (best-effort, may not be available in all builds)
-            engine_info = {{
-                "frame_rate": 0.0,
-                "current_frame": 0,
-                "time_since_start": 0.0,
-            }}
-            try:
-                engine_info["frame_rate"] = float(
-                    getattr(logic, "getAverageFrameRate", lambda: 0.0)()
-                )
-            except Exception:
-                pass
-            try:
-                engine_info["current_frame"] = int(
-                    getattr(logic, "getCurrentFrame", lambda: 0)()
-                )
-            except Exception:
-                pass
-            try:
-                engine_info["time_since_start"] = float(
-                    getattr(logic, "getTimeSinceStart", lambda: 0.0)()
-                )
-            except Exception:
-                pass
-            ctx["engine"] = engine_info
-
-            # Input snapshot: keyboard, mouse, joystick
-            kb_ctx = {{"pressed": [], "justPressed": [], "justReleased": []}}
-            mouse_ctx = {{
-                "position": [0, 0],
-                "pressed": [],
-                "justPressed": [],
-                "justReleased": [],
-                "wheelDelta": 0,
-            }}
-            joy_ctx = {{
-                "count": 0,
-                "buttonsPressed": {{}},
-                "axes": {{}},
-            }}
-
-            sensors_dict = {{}}
-            try:
-                if controller is not None:
-                    for sensor in getattr(controller, "sensors", []):
-                        sname = getattr(sensor, "name", "") or type(sensor).__name__
-                        positive = getattr(sensor, "positive", False)
-                        stype = getattr(sensor, "type", 0)
-                        sentry = {{"positive": bool(positive), "type": int(stype)}}
-                        # Collision sensor: hitObjectList (list of {{name}} for JS hitObj.name)
-                        hit_list = getattr(sensor, "hitObjectList", None)
-                        if hit_list is not None:
-                            try:
-                                sentry["hitObjectList"] = [{{"name": getattr(o, "name", str(i))}} for i, o in enumerate(hit_list)]
-                            except Exception:
-                                sentry["hitObjectList"] = []
-                        elif "Collision" in type(sensor).__name__ or (sname and "ollision" in sname):
-                            try:
-                                hit_list = getattr(sensor, "hit_object_list", None)
-                                if hit_list is not None:
-                                    sentry["hitObjectList"] = [{{"name": getattr(o, "name", str(i))}} for i, o in enumerate(hit_list)]
-                                else:
-                                    sentry["hitObjectList"] = []
-                            except Exception:
-                                sentry["hitObjectList"] = []
-
-                        # Keyboard: use sensor.inputs only (sensor.events is deprecated in UPBGE)
-                        try:
-                            ACTIVE = getattr(logic, "KX_INPUT_ACTIVE", 1)
-                            JUST_ACTIVATED = getattr(logic, "KX_INPUT_JUST_ACTIVATED", 2)
-                            JUST_RELEASED = getattr(logic, "KX_INPUT_JUST_RELEASED", 3)
-                            events_list = []
-                            inputs = getattr(sensor, "inputs", None)
-                            if inputs is not None:
-                                for keycode, evt in inputs.items():
-                                    try:
-                                        if getattr(evt, "active", False):
-                                            events_list.append([int(keycode), int(ACTIVE)])
-                                        if getattr(evt, "activated", False):
-                                            events_list.append([int(keycode), int(JUST_ACTIVATED)])
-                                        if getattr(evt, "released", False):
-                                            events_list.append([int(keycode), int(JUST_RELEASED)])
-                                    except Exception:
-                                        continue
-                            if events_list:
-                                sentry["events"] = events_list
-                            else:
-                                # Fallback: Keyboard sensor with getKeyStatus (inputs may be empty)
-                                if "Keyboard" in type(sensor).__name__ or stype == 1:
-                                    get_status = getattr(sensor, "getKeyStatus", None)
-                                    if get_status is not None and callable(get_status):
-                                        for kc in (87, 83, 65, 68, 119, 115, 97, 100):
-                                            try:
-                                                st = get_status(kc)
-                                                if st is not None and st != 0:
-                                                    events_list.append([int(kc), int(ACTIVE)])
-                                            except Exception:
-                                                pass
-                                        if events_list:
-                                            sentry["events"] = events_list
-                        except Exception:
-                            pass
-
-                        # Mouse: position, pressed, wheelDelta
-                        try:
-                            if "Mouse" in type(sensor).__name__ or getattr(sensor, "type", 0) == 12:
-                                pos = getattr(sensor, "position", None)
-                                if pos is not None:
-                                    sentry["position"] = [int(pos[0]), int(pos[1])]
-                                but = getattr(sensor, "getButtonStatus", None)
-                                if but is not None and callable(but):
-                                    sentry["pressed"] = [btn for btn in (1, 2, 4) if but(btn)]
-                                wheel = getattr(sensor, "wheel", None)
-                                if wheel is not None:
-                                    sentry["wheelDelta"] = int(wheel)
-                        except Exception:
-                            pass
-
-                        # Joystick: index, buttonsPressed, axisValues
-                        try:
-                            if "Joystick" in type(sensor).__name__ or getattr(sensor, "type", 0) == 13:
-                                sentry["index"] = getattr(sensor, "index", 0)
-                                buts = getattr(sensor, "getButtonStatus", None)
-                                if buts is not None and callable(buts):
-                                    sentry["buttonsPressed"] = [i for i in range(32) if buts(i)]
-                                ax = getattr(sensor, "axisValues", None)
-                                if ax is not None:
-                                    sentry["axisValues"] = [float(ax[i]) if i < len(ax) else 0.0 for i in range(4)]
-                        except Exception:
-                            pass
-
-                        sensors_dict[sname] = sentry
-
-                        # Keyboard: use sensor.inputs only for kb_ctx (sensor.events is deprecated)
-                        try:
-                            inputs = getattr(sensor, "inputs", None)
-                            if inputs is not None:
-                                for keycode, evt in inputs.items():
-                                    try:
-                                        if getattr(evt, "active", False):
-                                            kb_ctx["pressed"].append(int(keycode))
-                                        if getattr(evt, "activated", False):
-                                            kb_ctx["pressed"].append(int(keycode))
-                                            kb_ctx["justPressed"].append(int(keycode))
-                                        if getattr(evt, "released", False):
-                                            kb_ctx["justReleased"].append(int(keycode))
-                                    except Exception:
-                                        continue
-                        except Exception:
-                            pass
-
-                        # Mouse sensor: position, buttons, wheel
-                        try:
-                            if "Mouse" in type(sensor).__name__ or getattr(sensor, "type", 0) == 12:
-                                pos = getattr(sensor, "position", None)
-                                if pos is not None:
-                                    mouse_ctx["position"] = [int(pos[0]), int(pos[1])]
-                                but = getattr(sensor, "getButtonStatus", None)
-                                if but is not None and callable(but):
-                                    for btn in (1, 2, 4):
-                                        if but(btn):
-                                            if btn not in mouse_ctx["pressed"]:
-                                                mouse_ctx["pressed"].append(btn)
-                                wheel = getattr(sensor, "wheel", None)
-                                if wheel is not None:
-                                    mouse_ctx["wheelDelta"] = int(wheel)
-                        except Exception:
-                            pass
-
-                        # Joystick sensor
-                        try:
-                            if "Joystick" in type(sensor).__name__ or getattr(sensor, "type", 0) == 13:
-                                joy_ctx["count"] = max(joy_ctx["count"], 1)
-                                idx = str(getattr(sensor, "index", 0))
-                                buts = getattr(sensor, "getButtonStatus", None)
-                                if buts is not None and callable(buts):
-                                    pressed_list = [i for i in range(32) if buts(i)]
-                                    if pressed_list:
-                                        joy_ctx["buttonsPressed"][idx] = pressed_list
-                                ax = getattr(sensor, "axisValues", None)
-                                if ax is not None:
-                                    joy_ctx["axes"][idx] = [float(ax[i]) if i < len(ax) else 0.0 for i in range(4)]
-                        except Exception:
-                            pass
-
-                ctx["sensors"] = sensors_dict
-                ctx["keyboard"] = kb_ctx
-                ctx["mouse"] = mouse_ctx
-                ctx["joystick"] = joy_ctx
-            except Exception:
-                pass
-
-            # RayCast results from previous frame (one result per object)
-            try:
-                from upbge_nodejs_sdk.python.game_engine import script_handler
-                ctx["rayCastResults"] = getattr(script_handler, "_get_raycast_results", lambda: {{}})()
-            except Exception:
-                ctx["rayCastResults"] = {{}}
+    # Viewport and active camera (current scene)
+    try:
+        render = getattr(bge, "render", None)
+        if render is not None:
+            ctx["windowWidth"] = int(getattr(render, "getWindowWidth", lambda: 0)())
+            ctx["windowHeight"] = int(getattr(render, "getWindowHeight", lambda: 0)())
+        if scene is not None:
+            ac = getattr(scene, "active_camera", None)
+            if ac is not None:
+                ctx["active_camera_name"] = ac.name
+    except Exception:
+        pass
 
+    # Scene list snapshot
+    if keys is None or "scenes" in keys:
+        try:
+            scenes_data = _script_handler.get_frame_snapshot("scenes", frame_key)
+            if scenes_data is None:
+                scenes_data = [
+                    {
+                        "name": getattr(sc, "name", ""),
+                        "objects": [_intern(obj.name) for obj in getattr(sc, "objects", ())],
+                    }
+                    for sc in logic.getSceneList()
+                ]
+                _script_handler.set_frame_snapshot("scenes", frame_key, scenes_data)
+            if scenes_data:
+                ctx["scenes"] = scenes_data
+        except Exception:
+            pass
+
+    # Engine info (best-effort, may not be available in all builds)
+    engine_info = {
+        "frame_rate": 0.0,
+        "current_frame": 0,
+        "time_since_start": 0.0,
+    }
+    ctx["engine"] = engine_info
+    try:
+        engine_info["frame_rate"] = float(getattr(logic, "getAverageFrameRate", lambda: 0.0)())
+        engine_info["current_frame"] = int(getattr(logic, "getCurrentFrame", lambda: 0)())
+        engine_info["time_since_start"] = float(getattr(logic, "getTimeSinceStart", lambda: 0.0)())
     except Exception:
         pass
 
+    # Input snapshot: keyboard, mouse, joystick. Published before the sensor
+    # loop so whatever was gathered survives a failing sensor.
+    kb_ctx = {"pressed": [], "justPressed": [], "justReleased": []}
+    mouse_ctx = {
+        "position": [0, 0],
+        "pressed": [],
+        "justPressed": [],
+        "justReleased": [],
+        "wheelDelta": 0,
+    }
+    joy_ctx = {
+        "count": 0,
+        "buttonsPressed": {},
+        "axes": {},
+    }
+    sensors_dict = {}
+    ctx["sensors"] = sensors_dict
+    ctx["keyboard"] = kb_ctx
+    ctx["mouse"] = mouse_ctx
+    ctx["joystick"] = joy_ctx
+
+    if controller is not None:
+        try:
+            kb_pressed = kb_ctx["pressed"]
+            kb_just_pressed = kb_ctx["justPressed"]
+            kb_just_released = kb_ctx["justReleased"]
+            # One pass per sensor: fills its sensors_dict entry and the
+            # keyboard/mouse/joystick snapshots at the same time
+            for sensor in getattr(controller, "sensors", ()):
+                tname = type(sensor).__name__
+                sname = getattr(sensor, "name", "") or tname
+                stype = getattr(sensor, "type", 0)
+                sentry = {"positive": bool(getattr(sensor, "positive", False)), "type": int(stype)}
+
+                # Collision sensor: hitObjectList (list of {name} for JS hitObj.name)
+                hit_list = getattr(sensor, "hitObjectList", None)
+                if hit_list is None and ("Collision" in tname or "ollision" in sname):
+                    hit_list = getattr(sensor, "hit_object_list", None) or ()
+                if hit_list is not None:
+                    sentry["hitObjectList"] = [{"name": getattr(o, "name", str(i))} for i, o in enumerate(hit_list)]
+
+                # Keyboard: use sensor.inputs only (sensor.events is deprecated in UPBGE)
+                events_list = []
+                inputs = getattr(sensor, "inputs", None)
+                if inputs is not None:
+                    for keycode, evt in inputs.items():
+                        keycode = int(keycode)
+                        if getattr(evt, "active", False):
+                            events_list.append([keycode, _KX_ACTIVE])
+                            kb_pressed.append(keycode)
+                        if getattr(evt, "activated", False):
+                            events_list.append([keycode, _KX_JUST_ACTIVATED])
+                            kb_pressed.append(keycode)
+                            kb_just_pressed.append(keycode)
+                        if getattr(evt, "released", False):
+                            events_list.append([keycode, _KX_JUST_RELEASED])
+                            kb_just_released.append(keycode)
+                if not events_list and ("Keyboard" in tname or stype == 1):
+                    # Fallback: Keyboard sensor with getKeyStatus (inputs may be empty)
+                    get_status = getattr(sensor, "getKeyStatus", None)
+                    if get_status is not None:
+                        for kc in _WASD_KEYCODES:
+                            st = get_status(kc)
+                            if st is not None and st != 0:
+                                events_list.append([kc, _KX_ACTIVE])
+                if events_list:
+                    sentry["events"] = events_list
+
+                # Mouse: position, pressed, wheelDelta
+                if "Mouse" in tname or stype == 12:
+                    pos = getattr(sensor, "position", None)
+                    if pos is not None:
+                        sentry["position"] = mouse_ctx["position"] = [int(pos[0]), int(pos[1])]
+                    but = getattr(sensor, "getButtonStatus", None)
+                    if but is not None:
+                        pressed_list = [btn for btn in (1, 2, 4) if but(btn)]
+                        sentry["pressed"] = pressed_list
+                        mouse_pressed = mouse_ctx["pressed"]
+                        for btn in pressed_list:
+                            if btn not in mouse_pressed:
+                                mouse_pressed.append(btn)
+                    wheel = getattr(sensor, "wheel", None)
+                    if wheel is not None:
+                        sentry["wheelDelta"] = mouse_ctx["wheelDelta"] = int(wheel)
+
+                # Joystick: index, buttonsPressed, axisValues
+                if "Joystick" in tname or stype == 13:
+                    joy_ctx["count"] = max(joy_ctx["count"], 1)
+                    index = getattr(sensor, "index", 0)
+                    idx = str(index)
+                    sentry["index"] = index
+                    # getButtonActiveList() is one call; polling getButtonStatus is 32
+                    active_buttons = getattr(sensor, "getButtonActiveList", None)
+                    if active_buttons is not None:
+                        pressed_list = list(active_buttons())
+                    else:
+                        buts = getattr(sensor, "getButtonStatus", None)
+                        pressed_list = [i for i in range(32) if buts(i)] if buts is not None else None
+                    if pressed_list is not None:
+                        sentry["buttonsPressed"] = pressed_list
+                        if pressed_list:
+                            joy_ctx["buttonsPressed"][idx] = pressed_list
+                    ax = getattr(sensor, "axisValues", None)
+                    if ax is not None:
+                        axes = [round(float(v), _FLOAT_DIGITS) for v in ax[:4]]
+                        axes.extend((0.0,) * (4 - len(axes)))
+                        sentry["axisValues"] = axes
+                        joy_ctx["axes"][idx] = axes
+
+                sensors_dict[sname] = sentry
+        except Exception:
+            pass
+
+    # RayCast results from previous frame (one result per object)
+    try:
+        ctx["rayCastResults"] = _script_handler._get_raycast_results()
+    except Exception:
+        ctx["rayCastResults"] = {}
+
     return ctx
 
 
-# Try to import the SDK's script handler
+# Import the SDK's script handler on the first tick
 try:
-    # Try multiple import paths
-    try:
-        from upbge_nodejs_sdk.python.game_engine.script_handler import (
-            execute_controller_script,
-            is_javascript_file,
-        )
-    except ImportError:
-        # Fallback: try relative import or add to sys.path
-        import sys
-        import os
-        # Find addon path
-        addon_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-        if addon_path not in sys.path:
-            sys.path.insert(0, addon_path)
-        from python.game_engine.script_handler import (
-            execute_controller_script,
-            is_javascript_file,
-        )
-    
+    if _script_handler is None:
+        try:
+            import upbge_nodejs_sdk.python.game_engine.script_handler as _script_handler
+        except ImportError:
+            # Fallback: add the add-on's parent folder to sys.path
+            addon_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+            if addon_path not in sys.path:
+                sys.path.insert(0, addon_path)
+            import python.game_engine.script_handler as _script_handler
+
     # Get the script from bpy.data.texts
-    if SCRIPT_NAME in bpy.data.texts:
+    if SCRIPT_NAME and SCRIPT_NAME in bpy.data.texts:
         script_text = bpy.data.texts[SCRIPT_NAME].as_string()
         script_name = SCRIPT_NAME
         print("[UPBGE-JS] Wrapper executing script:", SCRIPT_NAME)
         # Check if it's a JavaScript file
-        if is_javascript_file(script_name):
+        if _script_handler.is_javascript_file(script_name):
             # Build context for JS runtime bridge
-            ctx = _build_context()
-            sens = ctx.get("sensors") or {{}}
-            kb_ev = (sens.get("Keyboard") or {{}}).get("events") or []
+            ctx = _build_context(_script_handler.get_context_keys(script_text))
+            sens = ctx.get("sensors") or {}
+            kb_ev = (sens.get("Keyboard") or {}).get("events") or []
             print("[UPBGE-JS] Context built object_name=", ctx.get("object_name"), " scene_name=", ctx.get("scene_name"), " sensors=", list(sens.keys()), " Keyboard.events_len=", len(kb_ev))
             # Execute via JavaScript runtime
-            success, error = execute_controller_script(script_text, script_name, context=ctx)
+            success, error = _script_handler.execute_controller_script(script_text, script_name, context=ctx)
             print("[UPBGE-JS] JS execution success=", success, " error=", error if error else "None")
             if not success:
-                print(f"JavaScript execution error: {{error}}")
+                print(f"JavaScript execution error: {error}")
         else:
-            # Regular Python script - execute normally
-            exec(compile(script_text, script_name, 'exec'), globals())
+            # Regular Python script - execute normally (compiled once, cached by the SDK)
+            exec(_script_handler.compile_python_script(script_text, script_name), globals())
+    elif SCRIPT_NAME is None:
+        print(f"No JavaScript script bound to this controller (game property '{SCRIPT_PROPERTY}' is missing).")
+        print("If the controller was renamed, load its JS file again and run 'Setup for JavaScript'")
     else:
-        print(f"Script '{{SCRIPT_NAME}}' not found in bpy.data.texts")
+        print(f"Script '{SCRIPT_NAME}' not found in bpy.data.texts")
         
 except ImportError as e:
-    print(f"UPBGE JavaScript SDK not found: {{e}}")
+    print(f"UPBGE JavaScript SDK not found: {e}")
     print("Please install and enable the UPBGE Node.js SDK add-on")
     # Fallback: try to execute as Python
-    if SCRIPT_NAME in bpy.data.texts:
+    if SCRIPT_NAME and SCRIPT_NAME in bpy.data.texts:
         try:
             script_text = bpy.data.texts[SCRIPT_NAME].as_string()
             exec(compile(script_text, SCRIPT_NAME, 'exec'), globals())
         except Exception as py_error:
-            print(f"Python execution error: {{py_error}}")
+            print(f"Python execution error: {py_error}")
 except Exception as e:
-    print(f"Error in script wrapper: {{e}}")
+    print(f"Error in script wrapper: {e}")
     import traceback
     traceback.print_exc()
 """
 
 
-def create_wrapper_script(script_name):
-    """Create or update a text block with the wrapper script for a specific script."""
-    # Sanitize script name for wrapper name
-    safe_name = script_name.replace('.', '_').replace('-', '_')
-    wrapper_name = f"__js_wrapper_{safe_name}__"
-    
-    # Generate wrapper code with script name (always use latest template)
-    wrapper_code = WRAPPER_CODE_TEMPLATE.format(script_name=script_name)
-    
-    if wrapper_name in bpy.data.texts:
-        wrapper = bpy.data.texts[wrapper_name]
-        wrapper.from_string(wrapper_code)
-    else:
-        wrapper = bpy.data.texts.new(wrapper_name)
-        wrapper.from_string(wrapper_code)
+_WRAPPER_CODE = _WRAPPER_HEADER + _WRAPPER_SCRIPT_NAME + _WRAPPER_BODY
+
+
+def script_property_name(controller_name):
+    """Return the game property that holds a controller's JS script name."""
+    return (SCRIPT_PROPERTY_PREFIX + controller_name)[:_MAX_PROPERTY_NAME]
+
+
+def get_or_create_generic_wrapper():
+    """Return the shared wrapper text block, creating or updating it as needed."""
+    wrapper = bpy.data.texts.get(GENERIC_WRAPPER_NAME)
+    if wrapper is None:
+        wrapper = bpy.data.texts.new(GENERIC_WRAPPER_NAME)
+        wrapper.from_string(_WRAPPER_CODE)
         wrapper.filepath = ""  # Internal script
-    
+    # Only rewrite when the template changed (e.g. after an SDK update)
+    elif wrapper.as_string() != _WRAPPER_CODE:
+        wrapper.from_string(_WRAPPER_CODE)
     return wrapper
 
 
+def get_bound_script(controller):
+    """Return the JS script name bound to a wrapper controller, or None."""
+    prop = controller.id_data.game.properties.get(script_property_name(controller.name))
+    if prop is None or prop.type != 'STRING':
+        return None
+    return prop.value or None
+
+
+def _property_collision(ob, controller_name):
+    """Return another controller on ob whose script property name is the same, or None."""
+    prop_name = script_property_name(controller_name)
+    for other in ob.game.controllers:
+        if other.name != controller_name and script_property_name(other.name) == prop_name:
+            return other
+    return None
+
+
+def _set_script_property(ob, controller_name, script_name):
+    """Store the script name in a string game property on the controller's object."""
+    prop_name = script_property_name(controller_name)
+    prop = ob.game.properties.get(prop_name)
+    if prop is None:
+        with bpy.context.temp_override(object=ob, active_object=ob):
+            bpy.ops.object.game_property_new(type='STRING', name=prop_name)
+        prop = ob.game.properties.get(prop_name)
+        if prop is None:
+            return False
+    elif prop.type != 'STRING':
+        prop.type = 'STRING'
+    prop.value = script_name
+    return True
+
+
 def assign_wrapper_to_controller(controller):
     """Assign the wrapper script to a controller that has a .js file."""
     if not controller or controller.type != 'PYTHON':
@@ -504,13 +458,19 @@ def assign_wrapper_to_controller(controller):
     if not (script_name.endswith(('.js', '.mjs'))):
         return False
     
-    # Create wrapper with reference to the original script
-    wrapper = create_wrapper_script(script_name)
-    
-    # Store reference to original script (we'll keep it accessible)
-    # The wrapper will look up the script by name from bpy.data.texts
+    # Property names are cut to 63 characters; long controller names may share one
+    other = _property_collision(controller.id_data, controller.name)
+    if other is not None:
+        print(f"UPBGE JavaScript SDK: controllers '{controller.name}' and '{other.name}' "
+              f"would share the script property '{script_property_name(controller.name)}'; "
+              "rename one of them")
+        return False
+
+    # The wrapper looks the script up by name from bpy.data.texts at run time
+    if not _set_script_property(controller.id_data, controller.name, script_name):
+        return False
     
-    # Assign wrapper to controller
-    controller.text = wrapper
+    # Assign the shared wrapper to the controller
+    controller.text = get_or_create_generic_wrapper()
     
     return True
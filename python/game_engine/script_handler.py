@@ -13,6 +13,10 @@ Versão com ponte JS → Python baseada em comandos em lote:
 - Este módulo lê esses comandos e os aplica usando a API real do BGE.
 """
 
+import atexit
+import threading
+from collections import OrderedDict
+
 import bpy
 from bpy.app.handlers import persistent
 
@@ -21,41 +25,115 @@ try:
 except Exception:  # Em alguns contextos pode não existir (fora do game engine)
     bge = None
 
-from runtime.nodejs import NodeJSRuntime
+try:
+    from mathutils import Euler
+except ImportError:  # Fora do Blender
+    Euler = None
+
+try:
+    import orjson  # Optional, faster parsing of the per-frame command batch
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+from runtime.nodejs import BRIDGE_OPS, NodeJSRuntime
 
 # Set to False to disable bridge flow logs
 DEBUG_BRIDGE_LOGS = True
 
-# RayCast results from previous frame: key = object_name, value = { "object", "point", "normal" }
-_raycast_results = {}
+# RayCast results from previous frame: key = object_name,
+# value = (hit object name, point, normal), None where nothing was hit
+# Oldest entries are dropped past _RAYCAST_RESULTS_MAX (e.g. despawned objects)
+_raycast_results = OrderedDict()
+_RAYCAST_RESULTS_MAX = 4096
+_NO_HIT = (None, None, None)
+
+# Merge adjacent applyMovement / setPosition commands on the same object before
+# applying them (set to False to apply every command as sent, for debugging)
+_FUSE_COMMANDS = True
+
+# Whether orientation setters accept a mathutils.Euler (None = not tried yet)
+_orientation_takes_euler = None
+
+# on_frame_change_pre is empty; only hook it into Blender when it does something
+_REGISTER_FRAME_HANDLER = False
+
+# Last scene resolved by name in _apply_commands (checked with KX_Scene.invalid)
+_scene_cache = {"name": None, "scene": None}
 
-# Vehicle constraints by chassis object name (for applyEngineForce, setSteeringValue, etc.)
+# scene.objects.get bound for the last scene searched by _scene_get_object()
+_objects_getter = {"scene": None, "get": None}
+
+# Let _scene_get_object() fall back to scanning scene.objects by name when
+# neither .get() nor [] finds the object (off: both are name lookups already)
+_SCAN_SCENE_OBJECTS = False
+
+# (controller, actuator) by (object name, actuator name) for the batch being
+# applied; cleared by every _apply_commands call
+_actuator_cache = {}
+
+# {name: scene} for the batch being applied, built on first use; cleared by
+# every _apply_commands call
+_scene_map = {}
+
+# bge.constraints functions by name (None = unavailable) for the batch being
+# applied; cleared by every _apply_commands call
+_constraint_funcs = {}
+
+# Vehicle constraints by chassis object name: (vehicle, applyEngineForce,
+# setSteeringValue, applyBraking, addWheel), methods bound once (None if missing)
 _vehicle_constraints = {}
+_NO_VEHICLE = (None, None, None, None, None)
 
 
-def _log(msg):
-    """Log bridge flow (enable/disable via DEBUG_BRIDGE_LOGS)."""
+def _log(fmt, *args):
+    """Log bridge flow (enable/disable via DEBUG_BRIDGE_LOGS).
+
+    Takes %-style arguments so nothing is formatted while logging is off.
+    """
     if DEBUG_BRIDGE_LOGS:
-        print(msg)
+        print(fmt % args if args else fmt)
 
 
-# Global runtime instance
+# Global runtime instance (one Node worker shared by all controllers)
 _runtime = None
+_runtime_lock = threading.Lock()
+
+# Compiled Python controller scripts (LRU), key = (script_name, len(text), hash(text)).
+# Kept here because the wrapper's own globals don't survive between logic ticks.
+_bytecode_cache = OrderedDict()
+_BYTECODE_CACHE_SIZE = 64
+
+# "// @bge-context: key, key" allowlists parsed from JS headers, key = (len(text), hash(text))
+_CONTEXT_DIRECTIVE = "@bge-context:"
+_context_keys_cache = {}
+
+# Scene-wide context snapshots (object_positions, scenes) reused by every JS
+# controller in the same logic frame; dropped when any commands are applied.
+_frame_snapshot_key = None
+_frame_snapshots = {}
 
 
 def get_runtime():
     """Get or create Node.js runtime instance."""
     global _runtime
-    if _runtime is None:
-        use_worker = False
-        try:
-            prefs = bpy.context.preferences.addons.get("upbge_nodejs_sdk")
-            if prefs and hasattr(prefs, "preferences") and getattr(prefs.preferences, "use_persistent_worker", False):
-                use_worker = True
-        except Exception:
-            pass
-        _runtime = NodeJSRuntime(use_worker=use_worker)
-    return _runtime
+    runtime = _runtime
+    if runtime is not None:
+        return runtime
+    with _runtime_lock:
+        if _runtime is None:
+            # Persistent worker unless the preference turns it off: spawning Node
+            # for every controller tick costs far more than the script itself
+            use_worker = True
+            try:
+                prefs = bpy.context.preferences.addons.get("upbge_nodejs_sdk")
+                if prefs and hasattr(prefs, "preferences"):
+                    use_worker = bool(getattr(prefs.preferences, "use_persistent_worker", True))
+            except Exception:
+                pass
+            _runtime = NodeJSRuntime(use_worker=use_worker)
+        return _runtime
 
 
 def is_javascript_file(filename):
@@ -65,34 +143,714 @@ def is_javascript_file(filename):
     return filename.endswith('.js') or filename.endswith('.mjs')
 
 
+def compile_python_script(script_text, script_name):
+    """Compile a Python controller script, reusing the code object while it is unchanged."""
+    key = (script_name, len(script_text), hash(script_text))
+    code = _bytecode_cache.get(key)
+    if code is None:
+        code = compile(script_text, script_name, 'exec', dont_inherit=True)
+        _bytecode_cache[key] = code
+        if len(_bytecode_cache) > _BYTECODE_CACHE_SIZE:
+            _bytecode_cache.popitem(last=False)
+    else:
+        _bytecode_cache.move_to_end(key)
+    return code
+
+
+def get_context_keys(script_text):
+    """Return the context keys a JS script declares in its header, or None to send everything.
+
+    The declaration is a comment among the script's leading comment lines:
+        // @bge-context: position, keyboard
+    Scene-wide snapshots (object_positions, scenes) are only built when listed.
+    """
+    key = (len(script_text), hash(script_text))
+    try:
+        return _context_keys_cache[key]
+    except KeyError:
+        pass
+    keys = None
+    for line in script_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("//"):
+            break
+        _, found, rest = line.partition(_CONTEXT_DIRECTIVE)
+        if found:
+            keys = frozenset(k.strip() for k in rest.split(",") if k.strip())
+            break
+    if len(_context_keys_cache) >= _BYTECODE_CACHE_SIZE:
+        _context_keys_cache.clear()
+    _context_keys_cache[key] = keys
+    return keys
+
+
+def get_frame_snapshot(name, frame_key):
+    """Return the snapshot stored under name for this logic frame, or None."""
+    if frame_key is None or frame_key != _frame_snapshot_key:
+        return None
+    return _frame_snapshots.get(name)
+
+
+def set_frame_snapshot(name, frame_key, value):
+    """Store a snapshot for this logic frame (snapshots of older frames are dropped)."""
+    global _frame_snapshot_key
+    if frame_key is None:
+        return
+    if frame_key != _frame_snapshot_key:
+        _frame_snapshots.clear()
+        _frame_snapshot_key = frame_key
+    _frame_snapshots[name] = value
+
+
+def _invalidate_frame_snapshots():
+    """Forget frame snapshots (objects may have moved, been added or removed)."""
+    global _frame_snapshot_key
+    _frame_snapshot_key = None
+    _frame_snapshots.clear()
+
+
 def _scene_get_object(scene, obj_name):
     """Get game object by name from scene. Works with .get() or [] access (UPBGE)."""
     if scene is None or not obj_name:
         return None
+    # scene.objects.get is probed once per scene, not on every lookup
+    if _objects_getter["scene"] is scene:
+        getter = _objects_getter["get"]
+    else:
+        getter = getattr(getattr(scene, "objects", None), "get", None)
+        _objects_getter["scene"] = scene
+        _objects_getter["get"] = getter
+    if getter is not None:
+        try:
+            return getter(obj_name)
+        except Exception:
+            _objects_getter["scene"] = _objects_getter["get"] = None
+            getter = None
+    # Rare: no usable .get on scene.objects (or it raised), index instead
     try:
         objs = scene.objects
-        if hasattr(objs, "get"):
-            return objs.get(obj_name)
-        return objs[obj_name]
-    except (KeyError, TypeError, IndexError):
+        if getter is None:
+            try:
+                return objs[obj_name]
+            except (KeyError, TypeError, IndexError):
+                pass
+        if _SCAN_SCENE_OBJECTS:
+            for o in objs:
+                if getattr(o, "name", None) == obj_name:
+                    return o
+    except Exception:
+        pass
+    return None
+
+
+def _get_raycast_results():
+    """Return rayCast results for context (read by wrapper).
+
+    Not a copy: the context is serialized before this frame's commands
+    (and so any new rayCast) are applied.
+    """
+    return _raycast_results
+
+
+def _store_raycast_result(obj_name, result):
+    _raycast_results[obj_name] = result
+    _raycast_results.move_to_end(obj_name)
+    if len(_raycast_results) > _RAYCAST_RESULTS_MAX:
+        _raycast_results.popitem(last=False)
+
+
+def _find_scene(logic, scene_name):
+    """Return the running scene called scene_name, or None."""
+    scene_list = logic.getSceneList()
+    if hasattr(scene_list, "get"):
+        return scene_list.get(scene_name)
+    for s in scene_list:
+        if getattr(s, "name", None) == scene_name:
+            return s
+    return None
+
+
+def _scenes_by_name(logic):
+    """{name: scene} of the running scenes, built once per command batch."""
+    if not _scene_map:
+        for s in logic.getSceneList():
+            _scene_map[getattr(s, "name", None)] = s
+    return _scene_map
+
+
+def _resolve_scene(logic, scene_name):
+    """Return the scene commands apply to, reusing the last one found by name.
+
+    An empty name means the current scene, which depends on the running
+    controller, so only named lookups are cached.
+    """
+    if scene_name:
+        cached = _scene_cache["scene"]
+        if cached is not None and _scene_cache["name"] == scene_name:
+            try:
+                if not cached.invalid:
+                    return cached
+            except Exception:
+                pass
+    try:
+        if scene_name:
+            scene = _find_scene(logic, scene_name)
+        else:
+            scene = logic.getCurrentScene()
+    except Exception:
         try:
-            objs = getattr(scene, "objects", None)
-            if objs is not None:
-                for o in objs:
-                    if getattr(o, "name", None) == obj_name:
-                        return o
+            scene = logic.getCurrentScene()
         except Exception:
-            pass
+            scene = None
+    if scene_name:
+        _scene_cache["name"] = scene_name
+        _scene_cache["scene"] = scene
+    return scene
+
+
+def _name_get(values, name):
+    """values.get(name) (CListValue), else values[name]; None when missing."""
+    get = getattr(values, "get", None)
+    if get is not None:
+        return get(name)
+    try:
+        return values[name]
+    except (KeyError, TypeError, IndexError):
+        return None
+
+
+def _find_actuator(obj, context, act_name):
+    """Return (controller, actuator) for the running controller's actuator, or (None, None)."""
+    ctrl_name = context.get("controller_name")
+    if not ctrl_name:
+        return None, None
+    ctrl = _name_get(getattr(obj, "controllers", None), ctrl_name)
+    if ctrl is None:
+        return None, None
+    return ctrl, _name_get(getattr(ctrl, "actuators", None), act_name)
+
+
+def _cached_actuator(obj, obj_name, context, act_name):
+    """_find_actuator() cached for the current command batch."""
+    key = (obj_name, act_name)
+    found = _actuator_cache.get(key)
+    if found is None:
+        found = _actuator_cache[key] = _find_actuator(obj, context, act_name)
+    return found
+
+
+_ZERO3 = (0.0, 0.0, 0.0)
+_DOWN_GRAVITY = (0.0, 0.0, -9.81)
+
+
+def _vec3(cmd, default=_ZERO3):
+    """cmd "vec" (or "value") as a float 3-tuple; raises if it's too short."""
+    d = cmd.get("vec") or cmd.get("value") or default
+    return (float(d[0]), float(d[1]), float(d[2]))
+
+
+def _vec3_from_key(cmd, key, default):
+    """cmd[key] as a float 3-tuple, default when missing/empty."""
+    d = cmd.get(key) or default
+    return (float(d[0]), float(d[1]), float(d[2]))
+
+
+def _constraint_func(name):
+    """bge.constraints.<name>, or None; looked up once per command batch."""
+    try:
+        return _constraint_funcs[name]
+    except KeyError:
+        func = _constraint_funcs[name] = getattr(getattr(bge, "constraints", None), name, None)
+        return func
+
+
+def _get_character(obj):
+    """Return the bge.constraints character wrapper for obj, or None."""
+    get_character = _constraint_func("getCharacter")
+    if get_character is not None:
+        return get_character(obj)
     return None
 
 
-def _get_raycast_results():
-    """Return copy of rayCast results for context (read by wrapper)."""
-    global _raycast_results
+# Global ops (no object required): handler(cmd, logic)
+
+def _op_end_game(cmd, logic):
+    logic.endGame()
+
+
+def _op_restart_game(cmd, logic):
+    logic.restartGame()
+
+
+def _op_set_gravity(cmd, logic):
+    x, y, z = _vec3(cmd, _DOWN_GRAVITY)
+    set_gravity = _constraint_func("setGravity")
+    if set_gravity is not None:
+        set_gravity(x, y, z)
+
+
+_GLOBAL_OPS = (
+    ("endGame", _op_end_game),
+    ("restartGame", _op_restart_game),
+    ("setGravity", _op_set_gravity),
+)
+
+
+# Object ops: handler(obj, obj_name, cmd, scene, context, logic)
+
+def _op_activate(obj, obj_name, cmd, scene, context, logic):
+    act_name = cmd.get("actuator")
+    if act_name and isinstance(act_name, str):
+        ctrl, act = _cached_actuator(obj, obj_name, context, act_name)
+        if act is not None:
+            ctrl.activate(act)
+
+
+def _op_deactivate(obj, obj_name, cmd, scene, context, logic):
+    act_name = cmd.get("actuator")
+    if act_name and isinstance(act_name, str):
+        ctrl, act = _cached_actuator(obj, obj_name, context, act_name)
+        if act is not None:
+            ctrl.deactivate(act)
+
+
+def _op_ray_cast(obj, obj_name, cmd, scene, context, logic):
+    get = cmd.get
+    to_vec = get("to")
+    if not (to_vec and len(to_vec) >= 3):
+        return
+    try:
+        from_vec = get("from")
+        to_v = (float(to_vec[0]), float(to_vec[1]), float(to_vec[2]))
+        from_v = (float(from_vec[0]), float(from_vec[1]), float(from_vec[2])) if from_vec and len(from_vec) >= 3 else None
+        hit = obj.rayCast(
+            to_v, from_v,
+            float(get("dist", 0.0)),
+            str(get("prop") or ""),
+            1 if get("face") else 0,
+            1 if get("xray") else 0,
+            0,
+            int(get("mask", 0xFFFF)),
+        )
+        if hit and len(hit) >= 3:
+            hit_obj, hit_point, hit_normal = hit[0], hit[1], hit[2]
+            _store_raycast_result(obj_name, (
+                getattr(hit_obj, "name", None),
+                (hit_point[0], hit_point[1], hit_point[2]) if hit_point is not None else None,
+                (hit_normal[0], hit_normal[1], hit_normal[2]) if hit_normal is not None else None,
+            ))
+        else:
+            _store_raycast_result(obj_name, _NO_HIT)
+    except Exception:
+        _store_raycast_result(obj_name, _NO_HIT)
+
+
+def _op_ray_cast_to(obj, obj_name, cmd, scene, context, logic):
+    get = cmd.get
+    target = get("target")
+    try:
+        dist = float(get("dist", 0.0))
+        prop = str(get("prop") or "")
+        if isinstance(target, list) and len(target) >= 3:
+            to_point = (float(target[0]), float(target[1]), float(target[2]))
+            hit_obj = obj.rayCastTo(to_point, dist, prop)
+        elif isinstance(target, str):
+            tgt = _scene_get_object(scene, target)
+            hit_obj = obj.rayCastTo(tgt, dist, prop) if tgt is not None else None
+        else:
+            hit_obj = None
+        _store_raycast_result(obj_name, (getattr(hit_obj, "name", None), None, None) if hit_obj is not None else _NO_HIT)
+    except Exception:
+        _store_raycast_result(obj_name, _NO_HIT)
+
+
+def _op_create_vehicle(obj, obj_name, cmd, scene, context, logic):
+    if obj_name in _vehicle_constraints:
+        return
+    create_vehicle = _constraint_func("createVehicle")
+    if create_vehicle is not None:
+        physics_id = getattr(obj, "getPhysicsId", lambda: 0)()
+        if physics_id:
+            vehicle = create_vehicle(physics_id)
+            _vehicle_constraints[obj_name] = (
+                vehicle,
+                getattr(vehicle, "applyEngineForce", None),
+                getattr(vehicle, "setSteeringValue", None),
+                getattr(vehicle, "applyBraking", None),
+                getattr(vehicle, "addWheel", None),
+            )
+
+
+def _op_vehicle_apply_engine_force(obj, obj_name, cmd, scene, context, logic):
+    wheel_index = int(cmd.get("wheelIndex", 0))
+    force = float(cmd.get("force", 0))
+    apply_engine_force = _vehicle_constraints.get(cmd.get("object") or obj_name, _NO_VEHICLE)[1]
+    if apply_engine_force is not None:
+        apply_engine_force(force, wheel_index)
+
+
+def _op_vehicle_set_steering_value(obj, obj_name, cmd, scene, context, logic):
+    wheel_index = int(cmd.get("wheelIndex", 0))
+    value = float(cmd.get("value", 0))
+    set_steering_value = _vehicle_constraints.get(cmd.get("object") or obj_name, _NO_VEHICLE)[2]
+    if set_steering_value is not None:
+        set_steering_value(value, wheel_index)
+
+
+def _op_vehicle_add_wheel(obj, obj_name, cmd, scene, context, logic):
+    chassis_name = cmd.get("object") or obj_name
+    wheel_name = cmd.get("wheel")
+    if not (chassis_name and wheel_name):
+        return
+    wheel_obj = _scene_get_object(scene, wheel_name)
+    attach_pos = _vec3_from_key(cmd, "attachPos", cmd.get("connectionPoint") or _ZERO3)
+    down_dir = _vec3_from_key(cmd, "downDir", (0.0, 0.0, -1.0))
+    axle_dir = _vec3_from_key(cmd, "axleDir", (0.0, 1.0, 0.0))
+    rest_len = float(cmd.get("suspensionRestLength", 0.5))
+    radius = float(cmd.get("wheelRadius", 0.4))
+    has_steering = bool(cmd.get("hasSteering", False))
+    add_wheel = _vehicle_constraints.get(chassis_name, _NO_VEHICLE)[4]
+    if add_wheel is not None and wheel_obj is not None:
+        add_wheel(
+            wheel_obj,
+            attach_pos,
+            down_dir,
+            axle_dir,
+            rest_len,
+            radius,
+            has_steering,
+        )
+
+
+def _op_vehicle_apply_braking(obj, obj_name, cmd, scene, context, logic):
+    wheel_index = int(cmd.get("wheelIndex", 0))
+    force = float(cmd.get("force", 0))
+    apply_braking = _vehicle_constraints.get(cmd.get("object") or obj_name, _NO_VEHICLE)[3]
+    if apply_braking is not None:
+        apply_braking(force, wheel_index)
+
+
+def _op_character_jump(obj, obj_name, cmd, scene, context, logic):
+    char = _get_character(obj)
+    if char is not None and hasattr(char, "jump"):
+        char.jump()
+
+
+def _op_character_walk_direction(obj, obj_name, cmd, scene, context, logic):
+    vec = _vec3(cmd)
+    char = _get_character(obj)
+    if char is not None and hasattr(char, "walkDirection"):
+        char.walkDirection = vec
+
+
+def _op_character_set_velocity(obj, obj_name, cmd, scene, context, logic):
+    vec = _vec3(cmd)
+    time_val = float(cmd.get("time", 0.2))
+    local = bool(cmd.get("local", False))
+    char = _get_character(obj)
+    if char is not None and hasattr(char, "setVelocity"):
+        char.setVelocity(vec, time_val, local)
+
+
+def _op_apply_movement(obj, obj_name, cmd, scene, context, logic):
+    vec = _vec3(cmd)
+    if DEBUG_BRIDGE_LOGS:
+        _log("[UPBGE-JS] applyMovement obj=%s vec=%s", obj_name, vec)
     try:
-        return dict(_raycast_results)
+        obj.applyMovement(vec, True)
     except Exception:
-        return {}
+        wp = obj.worldPosition  # one C getter instead of three
+        obj.worldPosition = (wp[0] + vec[0], wp[1] + vec[1], wp[2] + vec[2])
+
+
+def _op_set_position(obj, obj_name, cmd, scene, context, logic):
+    value = cmd.get("value")
+    if value is not None and len(value) >= 3:
+        obj.worldPosition = value
+
+
+def _set_orientation(obj, attr, value):
+    """Set worldOrientation/localOrientation from [x, y, z] Euler angles
+    or a 3x3 matrix given as nested lists."""
+    global _orientation_takes_euler
+    if isinstance(value[0], (list, tuple)):
+        # Already a matrix: BGE takes it as is
+        setattr(obj, attr, value)
+        return
+    try:
+        euler = Euler(value)
+    except Exception:
+        setattr(obj, attr, value)
+        return
+    if _orientation_takes_euler is not False:
+        # Skips the 3x3 Matrix when the setter takes the Euler as is
+        try:
+            setattr(obj, attr, euler)
+            _orientation_takes_euler = True
+            return
+        except Exception:
+            if _orientation_takes_euler is None:
+                _orientation_takes_euler = False
+    try:
+        setattr(obj, attr, euler.to_matrix())
+    except Exception:
+        setattr(obj, attr, value)
+
+
+def _op_set_rotation(obj, obj_name, cmd, scene, context, logic):
+    value = cmd.get("value")
+    if value is not None and len(value) >= 3:
+        _set_orientation(obj, "worldOrientation", value)
+
+
+def _op_look_at(obj, obj_name, cmd, scene, context, logic):
+    target_name = cmd.get("target")
+    if not target_name or target_name == obj_name:
+        return
+    target_obj = _scene_get_object(scene, target_name)
+    if target_obj is None:
+        return
+    # Unit vector from the target back to the object: the +Y axis is aligned
+    # to it. Plain floats, no mathutils temporaries.
+    pos = obj.worldPosition
+    tgt = target_obj.worldPosition
+    bx, by, bz = pos[0] - tgt[0], pos[1] - tgt[1], pos[2] - tgt[2]
+    len2 = bx * bx + by * by + bz * bz
+    if len2 <= 1e-6:
+        return
+    inv = len2 ** -0.5
+    bx, by, bz = bx * inv, by * inv, bz * inv
+    align = getattr(obj, "alignAxisToVect", None)
+    if align is not None:
+        # Fast path (every KX_GameObject): one C call
+        align((bx, by, bz), 1, 1.0)
+        return
+    # Rare fallback: build the rotation matrix by hand. With direction = -back
+    # and world up Z: right = direction x Z, up = right x direction.
+    rlen2 = bx * bx + by * by
+    if rlen2 > 1e-6:
+        rinv = rlen2 ** -0.5
+        rx, ry = -by * rinv, bx * rinv
+        ux, uy, uz = -ry * bz, rx * bz, ry * bx - rx * by
+        # Columns: right, back, up
+        obj.worldOrientation = ((rx, bx, ux), (ry, by, uy), (0.0, bz, uz))
+
+
+def _op_set_scale(obj, obj_name, cmd, scene, context, logic):
+    value = cmd.get("value")
+    if value is not None and len(value) >= 3:
+        try:
+            obj.worldScale = value
+        except Exception:
+            obj.localScale = value
+
+
+def _op_set_property(obj, obj_name, cmd, scene, context, logic):
+    props = cmd.get("props")
+    if props is not None:
+        # Batched by _fuse_commands; each write fails on its own, as unbatched
+        for prop_name, value in props.items():
+            try:
+                obj[prop_name] = value
+            except Exception:
+                continue
+        return
+    prop_name = cmd.get("property")
+    if prop_name:
+        obj[prop_name] = cmd.get("value")
+
+
+def _op_set_local_position(obj, obj_name, cmd, scene, context, logic):
+    value = cmd.get("value")
+    if value is not None and len(value) >= 3:
+        obj.localPosition = value
+
+
+def _op_set_local_rotation(obj, obj_name, cmd, scene, context, logic):
+    value = cmd.get("value")
+    if value is not None and len(value) >= 3:
+        _set_orientation(obj, "localOrientation", value)
+
+
+def _op_set_parent(obj, obj_name, cmd, scene, context, logic):
+    parent_name = cmd.get("parent")
+    if parent_name:
+        parent_obj = _scene_get_object(scene, parent_name)
+        if parent_obj is not None:
+            obj.setParent(parent_obj)
+    else:
+        obj.setParent(None)
+
+
+def _op_scene_add_object(obj, obj_name, cmd, scene, context, logic):
+    # BGE: scene.addObject(obj, owner, time) - obj can be from any scene
+    add_obj_name = cmd.get("object")
+    if not add_obj_name:
+        return
+    add_obj = _scene_get_object(scene, add_obj_name)
+    if add_obj is None:
+        for s in _scenes_by_name(logic).values():
+            add_obj = _scene_get_object(s, add_obj_name)
+            if add_obj is not None:
+                break
+    if add_obj is not None:
+        owner = context.get("object_name")
+        owner_obj = _scene_get_object(scene, owner) if owner else None
+        if hasattr(scene, "addObject") and owner_obj:
+            scene.addObject(add_obj, owner_obj, 0)
+
+
+def _op_scene_remove_object(obj, obj_name, cmd, scene, context, logic):
+    obj_to_remove = cmd.get("object")
+    if not obj_to_remove:
+        return
+    robj = _scene_get_object(scene, obj_to_remove)
+    if robj is not None:
+        if hasattr(scene.objects, "unlink"):
+            scene.objects.unlink(robj)
+        elif hasattr(scene, "unlink"):
+            scene.unlink(robj)
+
+
+def _op_set_viewport(obj, obj_name, cmd, scene, context, logic):
+    # Viewport: object = camera name
+    left = cmd.get("left")
+    bottom = cmd.get("bottom")
+    right = cmd.get("right")
+    top = cmd.get("top")
+    if left is not None and bottom is not None and right is not None and top is not None:
+        if hasattr(obj, "setViewport"):
+            obj.setViewport(int(left), int(bottom), int(right), int(top))
+
+
+def _op_set_active_camera(obj, obj_name, cmd, scene, context, logic):
+    # Active camera: object = camera name; optional scene = target scene name
+    tgt_scene = scene
+    cmd_scene = cmd.get("scene")
+    if cmd_scene and isinstance(cmd_scene, str):
+        try:
+            tgt_scene = _scenes_by_name(logic).get(cmd_scene)
+        except Exception:
+            pass
+    if tgt_scene is not None and hasattr(tgt_scene, "active_camera"):
+        tgt_scene.active_camera = obj
+
+
+_OBJECT_OPS = (
+    ("activate", _op_activate),
+    ("deactivate", _op_deactivate),
+    ("rayCast", _op_ray_cast),
+    ("rayCastTo", _op_ray_cast_to),
+    # Constraints (bge.constraints) – object-scoped
+    ("createVehicle", _op_create_vehicle),
+    ("vehicleApplyEngineForce", _op_vehicle_apply_engine_force),
+    ("vehicleSetSteeringValue", _op_vehicle_set_steering_value),
+    ("vehicleAddWheel", _op_vehicle_add_wheel),
+    ("vehicleApplyBraking", _op_vehicle_apply_braking),
+    ("characterJump", _op_character_jump),
+    ("characterWalkDirection", _op_character_walk_direction),
+    ("characterSetVelocity", _op_character_set_velocity),
+    # Transform / properties
+    ("applyMovement", _op_apply_movement),
+    ("setPosition", _op_set_position),
+    ("setRotation", _op_set_rotation),
+    ("lookAt", _op_look_at),
+    ("setScale", _op_set_scale),
+    ("setProperty", _op_set_property),
+    ("setLocalPosition", _op_set_local_position),
+    ("setLocalRotation", _op_set_local_rotation),
+    ("setParent", _op_set_parent),
+    ("sceneAddObject", _op_scene_add_object),
+    ("sceneRemoveObject", _op_scene_remove_object),
+    ("setViewport", _op_set_viewport),
+    ("setActiveCamera", _op_set_active_camera),
+)
+
+
+# Ops are dispatched by integer id (the JS bridge sends ids, see BRIDGE_OPS):
+# _OP_TABLE[op_id] is the handler, _OP_IS_GLOBAL[op_id] whether it needs no
+# object. Id 0 is "unknown op".
+_OP_NAMES = ("",) + BRIDGE_OPS
+_OP_TABLE = (None,) + tuple(dict(_GLOBAL_OPS + _OBJECT_OPS).get(name) for name in BRIDGE_OPS)
+_OP_IS_GLOBAL = (False,) + tuple(name in dict(_GLOBAL_OPS) for name in BRIDGE_OPS)
+_OP_IDS = {name: i for i, name in enumerate(_OP_NAMES) if name}
+_OP_APPLY_MOVEMENT = _OP_IDS["applyMovement"]
+_OP_SET_POSITION = _OP_IDS["setPosition"]
+_OP_SET_PROPERTY = _OP_IDS["setProperty"]
+
+
+def _normalize_commands(commands, default_obj_name):
+    """Turn parsed commands into (op_id, obj_name, cmd) tuples, reading op/object once."""
+    op_ids = _OP_IDS
+    num_ops = len(_OP_TABLE)
+    normalized = []
+    for cmd in commands:
+        try:
+            op = cmd.get("op")
+        except AttributeError:
+            continue  # not a dict
+        if type(op) is int:
+            op_id = op if 0 < op < num_ops else 0
+        elif isinstance(op, str):
+            op_id = op_ids.get(op, 0)  # op names (older bridge code)
+        else:
+            op_id = 0
+        normalized.append((op_id, cmd.get("object") or default_obj_name, cmd))
+    return normalized
+
+
+def _fuse_commands(normalized):
+    """Merge runs of same-object applyMovement (summed), setPosition (last wins)
+    and setProperty (one props dict, last value per key wins).
+
+    Only adjacent commands are merged, so the order JS issued them in is kept.
+    Summing is exact: movement is local and nothing rotates the object in between.
+    """
+    fused = []
+    prev_op = prev_name = None
+    for entry in normalized:
+        op_id, name, cmd = entry
+        if op_id == _OP_APPLY_MOVEMENT or op_id == _OP_SET_POSITION or op_id == _OP_SET_PROPERTY:
+            if op_id == prev_op and name == prev_name:
+                if op_id == _OP_SET_PROPERTY:
+                    prop_name = cmd.get("property")
+                    if prop_name:
+                        last = fused[-1][2]
+                        props = last.get("props")
+                        if props is None:
+                            props = {}
+                            if last.get("property"):
+                                props[last["property"]] = last.get("value")
+                            fused[-1] = (op_id, name, {"op": "setProperty", "object": name, "props": props})
+                        props[prop_name] = cmd.get("value")
+                    continue
+                if op_id == _OP_SET_POSITION:
+                    # A malformed later value is a no-op; it must not replace a valid one
+                    value = cmd.get("value")
+                    try:
+                        valid = value is not None and len(value) >= 3
+                    except TypeError:
+                        valid = False
+                    if valid:
+                        fused[-1] = entry
+                    continue
+                vec = cmd.get("vec") or cmd.get("value")
+                last = fused[-1][2]
+                last_vec = last.get("vec") or last.get("value")
+                try:
+                    summed = [last_vec[0] + vec[0], last_vec[1] + vec[1], last_vec[2] + vec[2]]
+                except (TypeError, IndexError):
+                    pass
+                else:
+                    fused[-1] = (op_id, name, {"op": "applyMovement", "object": name, "vec": summed})
+                    continue
+            prev_op, prev_name = op_id, name
+        else:
+            prev_op = prev_name = None
+        fused.append(entry)
+    return fused
 
 
 def _apply_commands(commands, context):
@@ -100,477 +858,81 @@ def _apply_commands(commands, context):
 
     Each command is expected to be a dict with:
         {
-            "op": "applyMovement" | "setPosition",
+            "op": "applyMovement" | "setPosition" | ... (see _GLOBAL_OPS / _OBJECT_OPS),
             "object": "<object_name>",
             "scene": "<scene_name>",
             "value" | "vec": [x, y, z]
         }
     """
-    if bge is None:
-        # Running outside game engine – nothing to apply
+    if not commands or bge is None:
+        # Nothing to do (idle frame), or running outside the game engine
         return
 
+    _invalidate_frame_snapshots()
+
     scene_name = context.get("scene_name") or ""
-    scene = None
 
     try:
         logic = bge.logic  # type: ignore[attr-defined]
     except Exception:
         return
 
-    try:
-        if scene_name:
-            scene_list = logic.getSceneList()
-            if hasattr(scene_list, "get"):
-                scene = scene_list.get(scene_name)
-            else:
-                scene = None
-                for s in scene_list:
-                    if getattr(s, "name", None) == scene_name:
-                        scene = s
-                        break
-        else:
-            scene = logic.getCurrentScene()
-    except Exception:
-        try:
-            scene = logic.getCurrentScene()
-        except Exception:
-            scene = None
+    scene = _resolve_scene(logic, scene_name)
 
     if scene is None:
         _log("[UPBGE-JS] _apply_commands: no scene, skip")
         return
 
-    _log("[UPBGE-JS] _apply_commands scene=%s object_name=%s num_commands=%s" % (
-        scene_name or "(current)", context.get("object_name"), len(commands or [])))
+    if DEBUG_BRIDGE_LOGS:
+        _log("[UPBGE-JS] _apply_commands scene=%s object_name=%s num_commands=%s",
+             scene_name or "(current)", context.get("object_name"), len(commands))
+
+    normalized = _normalize_commands(commands, context.get("object_name"))
+    if _FUSE_COMMANDS and len(normalized) > 1:
+        normalized = _fuse_commands(normalized)
+    # Loop-invariant lookups bound to locals
+    op_table = _OP_TABLE
+    op_is_global = _OP_IS_GLOBAL
+    get_object = _scene_get_object
+    # Objects resolved so far in this batch; most commands target the same few
+    # objects. Misses aren't cached: a later sceneAddObject may create the name.
+    resolved = {}
+    resolved_get = resolved.get
+    _actuator_cache.clear()
+    _constraint_funcs.clear()
+    _scene_map.clear()
 
-    for cmd in commands or []:
+    for op_id, obj_name, cmd in normalized:
         try:
-            op = cmd.get("op")
-            # Global ops (no object required)
-            if op == "endGame":
-                try:
-                    logic.endGame()
-                except Exception:
-                    pass
-                continue
-            if op == "restartGame":
-                try:
-                    logic.restartGame()
-                except Exception:
-                    pass
+            handler = op_table[op_id]
+            if handler is None:
                 continue
-            if op == "setGravity":
-                vec = cmd.get("vec") or cmd.get("value") or [0, 0, -9.81]
-                if len(vec) >= 3:
-                    try:
-                        constraints = getattr(bge, "constraints", None)
-                        if constraints is not None and hasattr(constraints, "setGravity"):
-                            constraints.setGravity(float(vec[0]), float(vec[1]), float(vec[2]))
-                    except Exception:
-                        pass
+            if op_is_global[op_id]:
+                handler(cmd, logic)
                 continue
 
-            obj_name = cmd.get("object") or context.get("object_name")
             if not obj_name:
                 continue
 
-            obj = _scene_get_object(scene, obj_name)
+            obj = resolved_get(obj_name)
             if obj is None:
-                _log("[UPBGE-JS] _apply_commands: object not found obj_name=%s scene=%s" % (obj_name, scene_name or "(current)"))
-                continue
-
-            if op == "activate":
-                act_name = cmd.get("actuator")
-                if act_name and isinstance(act_name, str):
-                    try:
-                        owner = obj
-                        ctrl_name = context.get("controller_name")
-                        if ctrl_name:
-                            ctrls = getattr(owner, "controllers", None)
-                            if ctrls is not None:
-                                ctrl = ctrls.get(ctrl_name) if hasattr(ctrls, "get") else None
-                                if ctrl is None and hasattr(ctrls, "__getitem__"):
-                                    try:
-                                        ctrl = ctrls[ctrl_name]
-                                    except (KeyError, TypeError):
-                                        pass
-                                if ctrl is not None:
-                                    actuators = getattr(ctrl, "actuators", None)
-                                    if actuators is not None:
-                                        act = actuators.get(act_name) if hasattr(actuators, "get") else None
-                                        if act is None and hasattr(actuators, "__getitem__"):
-                                            try:
-                                                act = actuators[act_name]
-                                            except (KeyError, TypeError):
-                                                pass
-                                        if act is not None:
-                                            ctrl.activate(act)
-                    except Exception:
-                        pass
-                continue
-            if op == "deactivate":
-                act_name = cmd.get("actuator")
-                if act_name and isinstance(act_name, str):
-                    try:
-                        owner = obj
-                        ctrl_name = context.get("controller_name")
-                        if ctrl_name:
-                            ctrls = getattr(owner, "controllers", None)
-                            if ctrls is not None:
-                                ctrl = ctrls.get(ctrl_name) if hasattr(ctrls, "get") else None
-                                if ctrl is None and hasattr(ctrls, "__getitem__"):
-                                    try:
-                                        ctrl = ctrls[ctrl_name]
-                                    except (KeyError, TypeError):
-                                        pass
-                                if ctrl is not None:
-                                    actuators = getattr(ctrl, "actuators", None)
-                                    if actuators is not None:
-                                        act = actuators.get(act_name) if hasattr(actuators, "get") else None
-                                        if act is None and hasattr(actuators, "__getitem__"):
-                                            try:
-                                                act = actuators[act_name]
-                                            except (KeyError, TypeError):
-                                                pass
-                                        if act is not None:
-                                            ctrl.deactivate(act)
-                    except Exception:
-                        pass
-                continue
-            if op == "rayCast":
-                to_vec = cmd.get("to")
-                if to_vec and len(to_vec) >= 3 and obj is not None:
-                    try:
-                        from_vec = cmd.get("from")
-                        dist = float(cmd.get("dist", 0))
-                        prop = str(cmd.get("prop") or "")
-                        face = bool(cmd.get("face", False))
-                        xray = bool(cmd.get("xray", False))
-                        mask = int(cmd.get("mask", 0xFFFF))
-                        to_v = (float(to_vec[0]), float(to_vec[1]), float(to_vec[2]))
-                        from_v = (float(from_vec[0]), float(from_vec[1]), float(from_vec[2])) if from_vec and len(from_vec) >= 3 else None
-                        hit = obj.rayCast(to_v, from_v, dist, prop, 1 if face else 0, 1 if xray else 0, 0, mask)
-                        if hit and len(hit) >= 3:
-                            hit_obj, hit_point, hit_normal = hit[0], hit[1], hit[2]
-                            key = obj_name
-                            _raycast_results[key] = {
-                                "object": hit_obj.name if hit_obj is not None else None,
-                                "point": list(hit_point) if hit_point is not None else None,
-                                "normal": list(hit_normal) if hit_normal is not None else None,
-                            }
-                        else:
-                            _raycast_results[obj_name] = {"object": None, "point": None, "normal": None}
-                    except Exception:
-                        _raycast_results[obj_name] = {"object": None, "point": None, "normal": None}
-                continue
-            if op == "rayCastTo":
-                target = cmd.get("target")
-                if obj is not None:
-                    try:
-                        dist = float(cmd.get("dist", 0))
-                        prop = str(cmd.get("prop") or "")
-                        if isinstance(target, list) and len(target) >= 3:
-                            to_point = (float(target[0]), float(target[1]), float(target[2]))
-                            hit_obj = obj.rayCastTo(to_point, dist, prop)
-                        elif isinstance(target, str):
-                            tgt = _scene_get_object(scene, target)
-                            hit_obj = obj.rayCastTo(tgt, dist, prop) if tgt is not None else None
-                        else:
-                            hit_obj = None
-                        _raycast_results[obj_name] = {
-                            "object": hit_obj.name if hit_obj is not None else None,
-                            "point": None,
-                            "normal": None,
-                        }
-                    except Exception:
-                        _raycast_results[obj_name] = {"object": None, "point": None, "normal": None}
-                continue
-            # Constraints (bge.constraints) – object-scoped
-            if op == "createVehicle":
-                if obj is not None and scene is not None and obj_name not in _vehicle_constraints:
-                    try:
-                        constraints = getattr(bge, "constraints", None)
-                        if constraints is not None and hasattr(constraints, "createVehicle"):
-                            physics_id = getattr(obj, "getPhysicsId", lambda: 0)()
-                            if physics_id:
-                                vehicle = constraints.createVehicle(physics_id)
-                                _vehicle_constraints[obj_name] = vehicle
-                    except Exception:
-                        pass
-                continue
-            if op == "vehicleApplyEngineForce":
-                chassis_name = cmd.get("object") or obj_name
-                wheel_index = int(cmd.get("wheelIndex", 0))
-                force = float(cmd.get("force", 0))
-                try:
-                    vehicle = _vehicle_constraints.get(chassis_name)
-                    if vehicle is not None and hasattr(vehicle, "applyEngineForce"):
-                        vehicle.applyEngineForce(force, wheel_index)
-                except Exception:
-                    pass
-                continue
-            if op == "vehicleSetSteeringValue":
-                chassis_name = cmd.get("object") or obj_name
-                wheel_index = int(cmd.get("wheelIndex", 0))
-                value = float(cmd.get("value", 0))
-                try:
-                    vehicle = _vehicle_constraints.get(chassis_name)
-                    if vehicle is not None and hasattr(vehicle, "setSteeringValue"):
-                        vehicle.setSteeringValue(value, wheel_index)
-                except Exception:
-                    pass
-                continue
-            if op == "vehicleAddWheel":
-                chassis_name = cmd.get("object") or obj_name
-                wheel_name = cmd.get("wheel")
-                if chassis_name and wheel_name and scene is not None:
-                    try:
-                        wheel_obj = _scene_get_object(scene, wheel_name)
-                        attach_pos = cmd.get("attachPos") or cmd.get("connectionPoint") or [0, 0, 0]
-                        down_dir = cmd.get("downDir") or [0, 0, -1]
-                        axle_dir = cmd.get("axleDir") or [0, 1, 0]
-                        rest_len = float(cmd.get("suspensionRestLength", 0.5))
-                        radius = float(cmd.get("wheelRadius", 0.4))
-                        has_steering = bool(cmd.get("hasSteering", False))
-                        vehicle = _vehicle_constraints.get(chassis_name)
-                        if vehicle is not None and wheel_obj is not None and hasattr(vehicle, "addWheel"):
-                            vehicle.addWheel(
-                                wheel_obj,
-                                (float(attach_pos[0]), float(attach_pos[1]), float(attach_pos[2])),
-                                (float(down_dir[0]), float(down_dir[1]), float(down_dir[2])),
-                                (float(axle_dir[0]), float(axle_dir[1]), float(axle_dir[2])),
-                                rest_len,
-                                radius,
-                                has_steering,
-                            )
-                    except Exception:
-                        pass
-                continue
-            if op == "vehicleApplyBraking":
-                chassis_name = cmd.get("object") or obj_name
-                wheel_index = int(cmd.get("wheelIndex", 0))
-                force = float(cmd.get("force", 0))
-                try:
-                    vehicle = _vehicle_constraints.get(chassis_name)
-                    if vehicle is not None and hasattr(vehicle, "applyBraking"):
-                        vehicle.applyBraking(force, wheel_index)
-                except Exception:
-                    pass
-                continue
-            if op == "characterJump":
+                obj = get_object(scene, obj_name)
                 if obj is not None:
-                    try:
-                        constraints = getattr(bge, "constraints", None)
-                        if constraints is not None and hasattr(constraints, "getCharacter"):
-                            char = constraints.getCharacter(obj)
-                            if char is not None and hasattr(char, "jump"):
-                                char.jump()
-                    except Exception:
-                        pass
-                continue
-            if op == "characterWalkDirection":
-                vec = cmd.get("vec") or cmd.get("value") or [0, 0, 0]
-                if obj is not None and len(vec) >= 3:
-                    try:
-                        constraints = getattr(bge, "constraints", None)
-                        if constraints is not None and hasattr(constraints, "getCharacter"):
-                            char = constraints.getCharacter(obj)
-                            if char is not None and hasattr(char, "walkDirection"):
-                                char.walkDirection = (float(vec[0]), float(vec[1]), float(vec[2]))
-                    except Exception:
-                        pass
-                continue
-            if op == "characterSetVelocity":
-                vec = cmd.get("vec") or cmd.get("value") or [0, 0, 0]
-                time_val = float(cmd.get("time", 0.2))
-                local = bool(cmd.get("local", False))
-                if obj is not None and len(vec) >= 3:
-                    try:
-                        constraints = getattr(bge, "constraints", None)
-                        if constraints is not None and hasattr(constraints, "getCharacter"):
-                            char = constraints.getCharacter(obj)
-                            if char is not None and hasattr(char, "setVelocity"):
-                                char.setVelocity((float(vec[0]), float(vec[1]), float(vec[2])), time_val, local)
-                    except Exception:
-                        pass
-                continue
-            if op == "applyMovement":
-                vec = cmd.get("vec") or cmd.get("value") or [0.0, 0.0, 0.0]
-                _log("[UPBGE-JS] applyMovement obj=%s vec=%s" % (obj_name, vec))
-                try:
-                    obj.applyMovement(vec, True)
-                except Exception:
-                    try:
-                        obj.worldPosition = [
-                            obj.worldPosition[0] + vec[0],
-                            obj.worldPosition[1] + vec[1],
-                            obj.worldPosition[2] + vec[2],
-                        ]
-                    except Exception:
-                        pass
-            elif op == "setPosition":
-                value = cmd.get("value")
-                if value is not None and len(value) >= 3:
-                    try:
-                        obj.worldPosition = value
-                    except Exception:
-                        pass
-            elif op == "setRotation":
-                value = cmd.get("value")
-                if value is not None and len(value) >= 3:
-                    try:
-                        from mathutils import Euler
-                        obj.worldOrientation = Euler(value).to_matrix()
-                    except Exception:
-                        try:
-                            obj.worldOrientation = value
-                        except Exception:
-                            pass
-            elif op == "lookAt":
-                target_name = cmd.get("target")
-                if target_name and target_name != obj_name:
-                    target_obj = _scene_get_object(scene, target_name)
-                    if target_obj is not None:
-                        try:
-                            import mathutils
-                            cam_pos = obj.worldPosition
-                            tgt_pos = target_obj.worldPosition
-                            direction = mathutils.Vector(
-                                (tgt_pos[0] - cam_pos[0], tgt_pos[1] - cam_pos[1], tgt_pos[2] - cam_pos[2])
-                            )
-                            if direction.length_squared > 1e-6:
-                                direction.normalize()
-                                align = getattr(obj, "alignAxisToVect", None)
-                                if align is not None and callable(align):
-                                    align(-direction, 1, 1.0)
-                                else:
-                                    up = mathutils.Vector((0, 0, 1))
-                                    right = direction.cross(up)
-                                    if right.length_squared > 1e-6:
-                                        right.normalize()
-                                        up = right.cross(direction)
-                                        m = mathutils.Matrix((right, -direction, up)).transposed()
-                                        obj.worldOrientation = m
-                        except Exception:
-                            pass
-            elif op == "setScale":
-                value = cmd.get("value")
-                if value is not None and len(value) >= 3:
-                    try:
-                        obj.worldScale = value
-                    except Exception:
-                        try:
-                            obj.localScale = value
-                        except Exception:
-                            pass
-            elif op == "setProperty":
-                prop_name = cmd.get("property")
-                if prop_name:
-                    try:
-                        obj[prop_name] = cmd.get("value")
-                    except Exception:
-                        pass
-            elif op == "setLocalPosition":
-                value = cmd.get("value")
-                if value is not None and len(value) >= 3:
-                    try:
-                        obj.localPosition = value
-                    except Exception:
-                        pass
-            elif op == "setLocalRotation":
-                value = cmd.get("value")
-                if value is not None and len(value) >= 3:
-                    try:
-                        from mathutils import Euler
-                        obj.localOrientation = Euler(value).to_matrix()
-                    except Exception:
-                        try:
-                            obj.localOrientation = value
-                        except Exception:
-                            pass
-            elif op == "setParent":
-                parent_name = cmd.get("parent")
-                try:
-                    if parent_name:
-                        parent_obj = _scene_get_object(scene, parent_name)
-                        if parent_obj is not None:
-                            obj.setParent(parent_obj)
-                    else:
-                        obj.setParent(None)
-                except Exception:
-                    pass
-            elif op == "sceneAddObject":
-                # BGE: scene.addObject(obj, owner, time) - obj can be from any scene
-                add_obj_name = cmd.get("object")
-                if add_obj_name and scene:
-                    try:
-                        add_obj = _scene_get_object(scene, add_obj_name)
-                        if add_obj is None:
-                            for s in logic.getSceneList():
-                                add_obj = _scene_get_object(s, add_obj_name)
-                                if add_obj is not None:
-                                    break
-                        if add_obj is not None:
-                            owner = context.get("object_name")
-                            owner_obj = _scene_get_object(scene, owner) if owner else None
-                            if hasattr(scene, "addObject") and owner_obj:
-                                scene.addObject(add_obj, owner_obj, 0)
-                    except Exception:
-                        pass
-                continue
-            elif op == "sceneRemoveObject":
-                obj_to_remove = cmd.get("object")
-                if obj_to_remove and scene:
-                    try:
-                        robj = _scene_get_object(scene, obj_to_remove)
-                        if robj is not None:
-                            if hasattr(scene.objects, "unlink"):
-                                scene.objects.unlink(robj)
-                            elif hasattr(scene, "unlink"):
-                                scene.unlink(robj)
-                    except Exception:
-                        pass
-                continue
-            # Viewport: object = camera name
-            if op == "setViewport":
-                left = cmd.get("left")
-                bottom = cmd.get("bottom")
-                right = cmd.get("right")
-                top = cmd.get("top")
-                if obj is not None and left is not None and bottom is not None and right is not None and top is not None:
-                    try:
-                        if hasattr(obj, "setViewport"):
-                            obj.setViewport(int(left), int(bottom), int(right), int(top))
-                    except Exception:
-                        pass
-                continue
-            # Active camera: object = camera name; optional scene = target scene name
-            if op == "setActiveCamera":
-                tgt_scene = scene
-                cmd_scene = cmd.get("scene")
-                if cmd_scene and isinstance(cmd_scene, str):
-                    try:
-                        scene_list = logic.getSceneList()
-                        if hasattr(scene_list, "get"):
-                            tgt_scene = scene_list.get(cmd_scene)
-                        else:
-                            for s in scene_list:
-                                if getattr(s, "name", None) == cmd_scene:
-                                    tgt_scene = s
-                                    break
-                    except Exception:
-                        pass
-                if obj is not None and tgt_scene is not None and hasattr(tgt_scene, "active_camera"):
-                    try:
-                        tgt_scene.active_camera = obj
-                    except Exception:
-                        pass
+                    resolved[obj_name] = obj
+            if obj is None:
+                if DEBUG_BRIDGE_LOGS:
+                    _log("[UPBGE-JS] _apply_commands: object not found obj_name=%s scene=%s", obj_name, scene_name or "(current)")
                 continue
+
+            handler(obj, obj_name, cmd, scene, context, logic)
         except Exception:
             continue
 
 
+_CMDS_MARKER = "___BGE_CMDS___"
+_CMDS_MARKER_BYTES = _CMDS_MARKER.encode("ascii")
+
+
 def _extract_commands(output):
     """Extract JSON commands from Node.js stdout.
 
@@ -582,25 +944,33 @@ def _extract_commands(output):
     if not output:
         return []
 
-    marker = "___BGE_CMDS___"
-    commands_str = ""
-    for line in output.splitlines():
-        if marker in line:
-            idx = line.find(marker)
-            rest = line[idx + len(marker) :].strip()
-            # Worker format: id\tjson; legacy format: json
-            if "\t" in rest:
-                rest = rest.split("\t", 1)[1]
-            commands_str = rest
-            break
+    # Raw subprocess output arrives as bytes: search it without decoding it all
+    if isinstance(output, bytes):
+        marker, newline, tab = _CMDS_MARKER_BYTES, b"\n", b"\t"
+    else:
+        marker, newline, tab = _CMDS_MARKER, "\n", "\t"
 
-    if not commands_str:
+    # The bridge prints the marker line last, so search from the end instead of
+    # splitting the whole (possibly log-heavy) output into lines
+    idx = output.rfind(marker)
+    if idx < 0:
         return []
+    start = idx + len(marker)
+    end = output.find(newline, start)
+    if end < 0:
+        end = len(output)
+    # Worker format: id\tjson; legacy format: json
+    tab_idx = output.find(tab, start, end)
+    if tab_idx >= 0:
+        start = tab_idx + 1
+    # One slice of the payload; the JSON parser skips surrounding whitespace
+    commands_str = output[start:end]
 
-    import json
+    if not commands_str.strip():
+        return []
 
     try:
-        data = json.loads(commands_str)
+        data = _json_loads(commands_str)
         if isinstance(data, list):
             return data
     except Exception:
@@ -619,6 +989,19 @@ def on_frame_change_pre(scene):
     return None
 
 
+def _read_frame(payload):
+    """Parse a commands frame from the worker's commands pipe (JSON bytes/bytearray)."""
+    if not payload:
+        return []
+    try:
+        data = _json_loads(payload)
+        if isinstance(data, list):
+            return data
+    except Exception:
+        pass
+    return []
+
+
 def execute_controller_script(script_text, filename, context=None):
     """
     Execute a controller script using JavaScript runtime with BGE command bridge.
@@ -636,33 +1019,44 @@ def execute_controller_script(script_text, filename, context=None):
         (success: bool, error_message: Optional[str])
     """
     context = context or {}
-    _log("[UPBGE-JS] execute_controller_script called script=%s" % (filename,))
+    _log("[UPBGE-JS] execute_controller_script called script=%s", filename)
 
     try:
         runtime = get_runtime()
 
         # Execute JavaScript and capture output / errors
+        # stdout comes back as bytes (str from the persistent worker);
+        # _extract_commands handles both
         output, error_output, success = runtime.execute_with_context(
-            script_text, context=context, timeout=10
+            script_text, context=context, timeout=10, raw_output=True, filename=filename
         )
-        _log("[UPBGE-JS] Node run success=%s output_len=%s stderr_len=%s" % (success, len(output or ""), len(error_output or "")))
+        if DEBUG_BRIDGE_LOGS:
+            _log("[UPBGE-JS] Node run success=%s output_len=%s stderr_len=%s", success, len(output or ""), len(error_output or ""))
 
         # Extraímos e aplicamos comandos, mesmo que o script tenha retornado erro,
         # mas só se o processo Node foi bem-sucedido.
         if success:
-            commands = _extract_commands(output)
-            _log("[UPBGE-JS] Extracted %s commands" % (len(commands),))
+            # Persistent worker (POSIX) sends commands on a separate pipe;
+            # otherwise they're in stdout after the marker
+            frame = runtime.take_commands_frame()
+            commands = _read_frame(frame) if frame is not None else _extract_commands(output)
+            if DEBUG_BRIDGE_LOGS:
+                _log("[UPBGE-JS] Extracted %s commands", len(commands))
+                if commands:
+                    _log("[UPBGE-JS] Commands: %s", commands[:3])
+                elif output:
+                    if isinstance(output, bytes):
+                        output = output.decode("utf-8", "replace")
+                    if _CMDS_MARKER in output:
+                        # Node sent marker but 0 commands: show JS debug lines from stdout
+                        for line in output.splitlines():
+                            if "[UPBGE-JS] DEBUG" in line:
+                                _log(line.strip())
+                            if _CMDS_MARKER in line:
+                                _log("[UPBGE-JS] Node sent (no commands): %s", line.strip()[:80])
+                                break
             if commands:
-                _log("[UPBGE-JS] Commands: %s" % (commands[:3] if len(commands) > 3 else commands,))
-            elif output and "___BGE_CMDS___" in output:
-                # Node sent marker but 0 commands: show JS debug lines from stdout
-                for line in (output or "").splitlines():
-                    if "[UPBGE-JS] DEBUG" in line:
-                        _log(line.strip())
-                    if "___BGE_CMDS___" in line:
-                        _log("[UPBGE-JS] Node sent (no commands): %s" % (line.strip()[:80],))
-                        break
-            _apply_commands(commands, context)
+                _apply_commands(commands, context)
 
         if not success:
             return False, error_output or "Unknown JavaScript execution error"
@@ -670,17 +1064,42 @@ def execute_controller_script(script_text, filename, context=None):
         return True, None
 
     except Exception as e:
-        _log("[UPBGE-JS] execute_controller_script exception: %s" % (e,))
+        _log("[UPBGE-JS] execute_controller_script exception: %s", e)
         return False, str(e)
 
 
+def _stop_runtime():
+    """Stop the shared Node worker (also run at interpreter exit)."""
+    global _runtime
+    if _runtime is not None:
+        _runtime.stop_worker()
+        _runtime = None
+
+
 def register():
     """Register script execution handlers."""
-    bpy.app.handlers.frame_change_pre.append(on_frame_change_pre)
+    if _REGISTER_FRAME_HANDLER:
+        bpy.app.handlers.frame_change_pre.append(on_frame_change_pre)
+    atexit.register(_stop_runtime)
+    # Start Node now rather than on the first controller tick. The runtime is
+    # created here (it reads preferences, main thread only); the worker
+    # spawn + warm-up request runs in the background.
+    try:
+        runtime = get_runtime()
+        threading.Thread(target=runtime.warm_up, daemon=True).start()
+    except Exception as e:
+        print(f"UPBGE JavaScript SDK: Could not warm up Node.js runtime: {e}")
     print("UPBGE JavaScript SDK: Script execution handler with JS bridge registered")
 
 
 def unregister():
     """Unregister script execution handlers."""
+    _scene_cache["name"] = _scene_cache["scene"] = None
+    _objects_getter["scene"] = _objects_getter["get"] = None
+    _actuator_cache.clear()
+    _constraint_funcs.clear()
+    _scene_map.clear()
+    atexit.unregister(_stop_runtime)
+    _stop_runtime()
     if on_frame_change_pre in bpy.app.handlers.frame_change_pre:
         bpy.app.handlers.frame_change_pre.remove(on_frame_change_pre)
@@ -4,10 +4,52 @@
 
 """UI panels and operators for JavaScript controllers in Logic Editor."""
 
+import functools
+import os
+
 import bpy
 from bpy.types import Panel, Operator
 from bpy.props import IntProperty, StringProperty
 
+from .python_wrapper import GENERIC_WRAPPER_NAME, get_bound_script
+
+_WRAPPER_PREFIX = "__js_wrapper_"
+_JS_EXTS = (".js", ".mjs")
+
+
+# Files above this size (generated bundles) are streamed into the Text and not cached
+_STREAM_THRESHOLD = 1 << 20
+_STREAM_CHUNK = 1 << 16
+
+
+@functools.lru_cache(maxsize=64)
+def _read_js(path, mtime_ns, size):
+    """Read a script file; mtime and size in the key drop stale entries."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _stream_into_text(path, text):
+    """Replace text with the file at path, read one chunk at a time.
+
+    The file goes into a new Text that takes over text's users and name once it
+    was read completely, so a read/decode error leaves text untouched.
+    Returns the new Text.
+    """
+    new_text = bpy.data.texts.new(text.name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for chunk in iter(lambda: f.read(_STREAM_CHUNK), ""):
+                new_text.write(chunk)
+    except Exception:
+        bpy.data.texts.remove(new_text)
+        raise
+    name = text.name
+    text.user_remap(new_text)
+    bpy.data.texts.remove(text)
+    new_text.name = name
+    return new_text
+
 
 class LOGIC_OT_add_javascript_controller(Operator):
     """Add a JavaScript controller (uses Python controller internally)"""
@@ -22,16 +64,12 @@ class LOGIC_OT_add_javascript_controller(Operator):
             self.report({'ERROR'}, "No active object with game properties")
             return {'CANCELLED'}
         
-        # Add a Python controller (we'll intercept execution for .js files)
-        bpy.ops.logic.controller_add(type='PYTHON')
+        # Add a Python controller (we'll intercept execution for .js files),
+        # named and targeted directly so the operator doesn't resolve the
+        # active object and no rename is needed afterwards
+        bpy.ops.logic.controller_add(type='PYTHON', name="JavaScript Controller", object=ob.name)
         
-        # Find the newly added controller
-        game = ob.game
-        if game.controllers:
-            controller = game.controllers[-1]
-            # Set name to indicate this is a JS controller
-            controller.name = "JavaScript Controller"
-            
+        if ob.game.controllers:
             self.report({'INFO'}, "JavaScript controller added. Assign a .js file to it.")
         
         return {'FINISHED'}
@@ -47,28 +85,7 @@ class LOGIC_OT_setup_js_controller(Operator):
     controller_index: bpy.props.IntProperty(name="Controller Index", default=-1)
     
     def execute(self, context):
-        # Import python_wrapper from the same directory
-        import sys
-        import os
-        import importlib.util
-        
-        # Get the directory where this file is located
-        game_engine_dir = os.path.dirname(os.path.abspath(__file__))
-        python_wrapper_path = os.path.join(game_engine_dir, "python_wrapper.py")
-        
-        # Load python_wrapper module if not already loaded
-        module_name = "game_engine.python_wrapper"
-        if module_name not in sys.modules:
-            spec = importlib.util.spec_from_file_location(module_name, python_wrapper_path)
-            if spec and spec.loader:
-                python_wrapper = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = python_wrapper
-                spec.loader.exec_module(python_wrapper)
-            else:
-                self.report({'ERROR'}, f"Could not load python_wrapper module from {python_wrapper_path}")
-                return {'CANCELLED'}
-        else:
-            python_wrapper = sys.modules[module_name]
+        from . import python_wrapper
         
         assign_wrapper_to_controller = python_wrapper.assign_wrapper_to_controller
         
@@ -115,8 +132,6 @@ class LOGIC_OT_load_js_from_file(Operator):
         return {'RUNNING_MODAL'}
 
     def execute(self, context):
-        import os
-
         ob = context.active_object
         if not ob or not ob.game:
             self.report({'ERROR'}, "No active object")
@@ -134,10 +149,13 @@ class LOGIC_OT_load_js_from_file(Operator):
 
         controller = game.controllers[idx]
 
-        # Read file contents
+        # Read file contents (large files are streamed into the Text below)
         try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                contents = f.read()
+            st = os.stat(self.filepath)
+            if st.st_size > _STREAM_THRESHOLD:
+                contents = None
+            else:
+                contents = _read_js(self.filepath, st.st_mtime_ns, st.st_size)
         except Exception as e:
             self.report({'ERROR'}, f"Failed to read file: {e}")
             return {'CANCELLED'}
@@ -148,9 +166,17 @@ class LOGIC_OT_load_js_from_file(Operator):
         if text is None:
             text = bpy.data.texts.new(basename)
 
-        text.clear()
-        text.write(contents)
-        text.filepath = self.filepath
+        if contents is None:
+            try:
+                text = _stream_into_text(self.filepath, text)
+            except Exception as e:
+                self.report({'ERROR'}, f"Failed to read file: {e}")
+                return {'CANCELLED'}
+            text.filepath = self.filepath
+        # Re-assigning an unchanged file keeps the existing lines
+        elif text.filepath != self.filepath or text.as_string() != contents:
+            text.from_string(contents)
+            text.filepath = self.filepath
 
         controller.text = text
         self.report({'INFO'}, f"Assigned {basename} to controller '{controller.name}'")
@@ -189,45 +215,53 @@ class LOGIC_PT_javascript_controllers(Panel):
         
         # List controllers (we always show Python controllers so user can attach files)
         js_controllers = []
-        for controller in game.controllers:
-            if controller.type == 'PYTHON':
-                text_name = controller.text.name if getattr(controller, "text", None) else ""
-                js_controllers.append((controller, text_name))
+        for i, c in enumerate(game.controllers):
+            if c.type == 'PYTHON':
+                text = c.text
+                js_controllers.append((i, c, text, text.name if text else ""))
         
         if js_controllers:
             layout.separator()
             box = layout.box()
             box.label(text="Active Controllers:", icon='SCRIPT')
             
-            for controller, text_name in js_controllers:
-                row = box.row()
-                row.label(text=f"{controller.name}", icon='SCRIPT')
+            for index, controller, text, text_name in js_controllers:
+                box.label(text=f"{controller.name}", icon='SCRIPT')
                 
-                # Show script file
                 # Show script info and button to load from file
-                row = box.row()
-                if controller.text and controller.text.filepath:
-                    row.label(text=f"File: {bpy.path.basename(controller.text.filepath)}")
-                elif controller.text:
-                    row.label(text=f"Text: {controller.text.name}")
+                split = box.split(factor=0.65)
+                is_wrapper = text_name.startswith(_WRAPPER_PREFIX)
+                if is_wrapper:
+                    if text_name == GENERIC_WRAPPER_NAME:
+                        bound_script = get_bound_script(controller)
+                    else:
+                        # Legacy per-script wrapper (__js_wrapper_<script>__), the
+                        # script name is baked into its code
+                        bound_script = text_name[len(_WRAPPER_PREFIX):].removesuffix("__")
+                    if bound_script:
+                        split.label(text=f"Script: {bound_script}")
+                    else:
+                        split.label(text="No script bound (renamed?)", icon='ERROR')
+                elif text and text.filepath:
+                    split.label(text=f"File: {bpy.path.basename(text.filepath)}")
+                elif text:
+                    split.label(text=f"Text: {text_name}")
                 else:
-                    row.label(text="No script assigned")
-                op_load = row.operator("logic.load_js_from_file", text="Load JS File", icon='FILEBROWSER')
+                    split.label(text="No script assigned")
+                op_load = split.operator("logic.load_js_from_file", text="Load JS File", icon='FILEBROWSER')
                 op_load.controller_name = controller.name
                 
-                # Show file type indicator (only for JS files)
-                if text_name.endswith(('.js', '.mjs')):
-                    row = box.row()
-                    row.label(text="JavaScript file", icon='INFO')
-                    # Check if wrapper is already assigned
-                    wrapper_name = f"__js_wrapper_{text_name.replace('.', '_').replace('-', '_')}__"
-                    if controller.text.name == wrapper_name or controller.text.name.startswith("__js_wrapper_"):
-                        row = box.row()
-                        row.label(text="✓ Configured for JavaScript execution", icon='CHECKMARK')
+                # Wrapper assigned (every wrapper name has the prefix), or a JS file to set up
+                if is_wrapper:
+                    if bound_script:
+                        box.label(text="✓ Configured for JavaScript execution", icon='CHECKMARK')
                     else:
-                        row = box.row()
-                        op = row.operator("logic.setup_js_controller", text="Setup for JavaScript")
-                        op.controller_index = game.controllers.find(controller.name)
+                        box.label(text="Load the JS file again and run Setup for JavaScript")
+                elif text_name.endswith(_JS_EXTS):
+                    col = box.column()
+                    col.label(text="JavaScript file", icon='INFO')
+                    op = col.operator("logic.setup_js_controller", text="Setup for JavaScript")
+                    op.controller_index = index
                 
                 box.separator()
         
@@ -6,10 +6,13 @@
 
 import os
 import sys
+import shutil
 import bpy
 import subprocess
 from bpy.types import Operator
 
+from .preferences import get_prefs, invalidate_sdk_exists_cache
+
 
 class SDK_INSTALL_OT_operator(Operator):
     """Install UPBGE JavaScript SDK"""
@@ -18,10 +21,9 @@ class SDK_INSTALL_OT_operator(Operator):
     bl_description = "Download and install the UPBGE JavaScript SDK"
     
     def execute(self, context):
-        preferences = context.preferences
-        addon_prefs = preferences.addons["upbge_nodejs_sdk"].preferences
+        addon_prefs = get_prefs(context)
         
-        sdk_path = addon_prefs.sdk_path
+        sdk_path = addon_prefs.sdk_path if addon_prefs is not None else ""
         if sdk_path == "":
             self.report({'ERROR'}, "Please set SDK path in preferences first")
             return {'CANCELLED'}
@@ -29,11 +31,13 @@ class SDK_INSTALL_OT_operator(Operator):
         # For now, just create the directory structure
         # In the future, this would download from GitHub releases
         try:
-            os.makedirs(sdk_path, exist_ok=True)
-            os.makedirs(os.path.join(sdk_path, "python"), exist_ok=True)
-            os.makedirs(os.path.join(sdk_path, "runtime"), exist_ok=True)
-            os.makedirs(os.path.join(sdk_path, "lib"), exist_ok=True)
-            os.makedirs(os.path.join(sdk_path, "types"), exist_ok=True)
+            # makedirs creates sdk_path itself along with the first subdirectory
+            for sub in ("python", "runtime", "lib", "types"):
+                os.makedirs(os.path.join(sdk_path, sub), exist_ok=True)
+            from .runtime.nodejs import get_compile_cache_dir
+            os.makedirs(get_compile_cache_dir(sdk_path), exist_ok=True)
+            # Paths probed before the install may be cached as missing
+            invalidate_sdk_exists_cache()
             
             self.report({'INFO'}, f"SDK directory structure created at {sdk_path}")
             self.report({'INFO'}, "Note: Node.js need to be added manually")
@@ -69,6 +73,31 @@ class SDK_RESTORE_OT_operator(Operator):
         return {'FINISHED'}
 
 
+class SDK_CLEAR_COMPILE_CACHE_OT_operator(Operator):
+    """Delete Node's on-disk compile cache"""
+    bl_idname = "sdk.clear_compile_cache"
+    bl_label = "Clear Compile Cache"
+    bl_description = "Delete the Node.js compile cache stored in the SDK directory"
+
+    def execute(self, context):
+        # The same directory the runtime hands to Node
+        from .runtime.nodejs import get_compile_cache_dir
+        cache_dir = get_compile_cache_dir()
+        if not cache_dir:
+            self.report({'ERROR'}, "Please set SDK path in preferences first")
+            return {'CANCELLED'}
+
+        try:
+            if os.path.isdir(cache_dir):
+                shutil.rmtree(cache_dir)
+            self.report({'INFO'}, "Compile cache cleared")
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to clear compile cache: {str(e)}")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+
 class SDK_OPEN_IN_EDITOR_OT_operator(Operator):
     """Open SDK or current project in external editor"""
 
@@ -82,10 +111,8 @@ class SDK_OPEN_IN_EDITOR_OT_operator(Operator):
         return self.execute(context)
 
     def execute(self, context):
-        prefs = context.preferences
-        try:
-            addon_prefs = prefs.addons["upbge_nodejs_sdk"].preferences
-        except KeyError:
+        addon_prefs = get_prefs(context)
+        if addon_prefs is None:
             self.report({'ERROR'}, "UPBGE Node.js SDK preferences not found")
             return {'CANCELLED'}
 
@@ -137,7 +164,12 @@ class SDK_OPEN_IN_EDITOR_OT_operator(Operator):
             cmd = [editor_bin, target_path]
             # When opening a file, cwd can still be the project/addon dir
             cwd = target_path if os.path.isdir(target_path) else os.path.dirname(target_path)
-            subprocess.Popen(cmd, cwd=cwd or None)
+            # Detach the editor from Blender's console/session so it outlives it
+            if sys.platform == "win32":
+                flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                subprocess.Popen(cmd, cwd=cwd or None, creationflags=flags)
+            else:
+                subprocess.Popen(cmd, cwd=cwd or None, close_fds=True, start_new_session=True)
 
         except FileNotFoundError as e:
             self.report({'ERROR'}, f"Failed to start external editor: {e}")
@@ -5,11 +5,95 @@
 """SDK preferences and settings."""
 
 import os
+import sys
+import functools
 import bpy
 from bpy.props import *
 from bpy.types import AddonPreferences
 
 
+def _find_addon_module():
+    """Return the add-on's top-level module (it provides restart_sdk), or None."""
+    # Imported as <addon>.python.preferences by the add-on itself
+    package = (__package__ or "").rpartition(".")[0]
+    if package in sys.modules:
+        return sys.modules[package]
+    # The module is named 'upbge_nodejs_sdk' when installed via ZIP
+    try:
+        import upbge_nodejs_sdk
+        return upbge_nodejs_sdk
+    except ImportError:
+        pass
+    # During development the add-on directory may have a different name
+    addon_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    addon_dir_name = os.path.basename(addon_path).replace('-', '_').replace('.', '_')
+    return sys.modules.get(addon_dir_name)
+
+
+# Resolved once; sdk_path_update runs on every edit of the path field
+_ADDON_MODULE = _find_addon_module()
+
+
+def invalidate_sdk_exists_cache():
+    """Forget the add-on's memoized SDK path checks (after SDK folders were created)."""
+    if _ADDON_MODULE is not None and hasattr(_ADDON_MODULE, '_invalidate_exists_cache'):
+        _ADDON_MODULE._invalidate_exists_cache()
+
+
+# Delay before a path edit restarts the SDK; later edits push the restart back
+_RESTART_DELAY = 0.3
+
+
+def _restart_sdk_timer():
+    """bpy.app.timers callback: restart the SDK once a burst of edits has settled."""
+    if _ADDON_MODULE is not None and hasattr(_ADDON_MODULE, 'restart_sdk'):
+        _ADDON_MODULE.restart_sdk(bpy.context)
+    return None
+
+
+def schedule_restart():
+    """(Re)start the debounce timer for restart_sdk."""
+    cancel_pending_restart()
+    bpy.app.timers.register(_restart_sdk_timer, first_interval=_RESTART_DELAY)
+
+
+def cancel_pending_restart():
+    """Drop a restart that is still waiting in the timer."""
+    if bpy.app.timers.is_registered(_restart_sdk_timer):
+        bpy.app.timers.unregister(_restart_sdk_timer)
+
+
+# This add-on's AddonPreferences handle, see get_prefs(). Dropped on
+# unregister and after loading a blend file, when it may point to freed RNA data.
+_prefs = None
+
+
+def get_prefs(context):
+    """Return this add-on's preferences (memoized), or None if the add-on isn't enabled."""
+    global _prefs
+    if _prefs is None:
+        addon = context.preferences.addons.get(SDKAddonPreferences.bl_idname)
+        if addon is None:
+            return None
+        _prefs = addon.preferences
+    return _prefs
+
+
+def invalidate_prefs_cache():
+    """Drop the memoized preferences handle."""
+    global _prefs
+    _prefs = None
+
+
+@functools.lru_cache(maxsize=32)
+def _normalize_sdk_path(path, blend_path):
+    """Absolute, reduced SDK path with a trailing slash.
+
+    blend_path is only part of the cache key: '//' paths resolve against it.
+    """
+    return bpy.path.reduce_dirs([bpy.path.abspath(path)])[0] + '/'
+
+
 class SDKAddonPreferences(AddonPreferences):
     bl_idname = "upbge_nodejs_sdk"
 
@@ -17,26 +101,9 @@ class SDKAddonPreferences(AddonPreferences):
         if self.skip_update:
             return
         self.skip_update = True
-        self.sdk_path = bpy.path.reduce_dirs([bpy.path.abspath(self.sdk_path)])[0] + '/'
-        # Restart SDK when path changes - import from main module
-        # O nome do módulo é 'upbge_nodejs_sdk' quando instalado via ZIP
-        try:
-            import upbge_nodejs_sdk
-            if hasattr(upbge_nodejs_sdk, 'restart_sdk'):
-                upbge_nodejs_sdk.restart_sdk(context)
-        except ImportError:
-            # Durante desenvolvimento, o diretório pode ter nome diferente
-            # Tentar encontrar o módulo do add-on através do sys.modules
-            import sys
-            import os
-            addon_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            addon_dir_name = os.path.basename(addon_path).replace('-', '_').replace('.', '_')
-            if addon_dir_name in sys.modules:
-                module = sys.modules[addon_dir_name]
-                if hasattr(module, 'restart_sdk'):
-                    module.restart_sdk(context)
-        except:
-            pass
+        self.sdk_path = _normalize_sdk_path(self.sdk_path, bpy.data.filepath)
+        # Restart SDK when path changes (debounced, typing fires this per keystroke)
+        schedule_restart()
 
     skip_update: BoolProperty(name="", default=False)
     
@@ -80,7 +147,7 @@ class SDKAddonPreferences(AddonPreferences):
 
     use_persistent_worker: BoolProperty(
         name="Use Persistent Worker",
-        default=False,
+        default=True,
         description="Keep one Node process per game session (better performance, one process per frame instead of spawn)"
     )
 
@@ -117,6 +184,7 @@ class SDKAddonPreferences(AddonPreferences):
         box.label(text="Advanced Settings")
         box.prop(self, "auto_update")
         box.prop(self, "use_persistent_worker")
+        box.operator("sdk.clear_compile_cache")
         
         if self.nodejs_path:
             box.label(text=f"Node.js: {self.nodejs_path}")
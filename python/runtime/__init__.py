@@ -4,6 +4,13 @@
 
 """Runtime JavaScript execution modules."""
 
+# Not an add-on, see the bl_info note in python/__init__.py
+bl_info = {
+    "name": "UPBGE Node.js SDK Runtime (internal)",
+    "blender": (5, 0, 0),
+    "category": "",
+}
+
 __all__ = (
     "nodejs",
 )
@@ -6,14 +6,24 @@
 
 import sys
 import os
+import io
+import json
+import queue
 import subprocess
 import platform
+import threading
+import time
 
 try:
     import bpy
 except ImportError:
     bpy = None
 
+try:
+    import orjson  # Optional, much faster than json for the per-frame context
+except ImportError:
+    orjson = None
+
 # Set to False to disable Node runtime flow logs
 DEBUG_NODE_LOGS = True
 
@@ -23,6 +33,63 @@ def _node_log(msg):
         print("[UPBGE-JS] " + msg)
 
 
+def _dumps_json(data):
+    """Serialize bridge data (context, worker requests) to a JSON string (orjson when available)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data).decode("utf-8")
+        except TypeError:
+            # e.g. non-str keys in game properties; let json handle/reject it
+            pass
+    return json.dumps(data)
+
+
+# Bridge ops in id order: JS sends {"op": <id>} (id = index + 1, 0 = unknown)
+# and script_handler dispatches on the same ids. Append new ops at the end.
+BRIDGE_OPS = (
+    "endGame",
+    "restartGame",
+    "setGravity",
+    "activate",
+    "deactivate",
+    "rayCast",
+    "rayCastTo",
+    "createVehicle",
+    "vehicleApplyEngineForce",
+    "vehicleSetSteeringValue",
+    "vehicleAddWheel",
+    "vehicleApplyBraking",
+    "characterJump",
+    "characterWalkDirection",
+    "characterSetVelocity",
+    "applyMovement",
+    "setPosition",
+    "setRotation",
+    "lookAt",
+    "setScale",
+    "setProperty",
+    "setLocalPosition",
+    "setLocalRotation",
+    "setParent",
+    "sceneAddObject",
+    "sceneRemoveObject",
+    "setViewport",
+    "setActiveCamera",
+)
+
+_BRIDGE_OP_IDS_JSON = _dumps_json({name: i for i, name in enumerate(BRIDGE_OPS, 1)})
+
+
+def _dumps_json_bytes(data):
+    """Like _dumps_json, but UTF-8 bytes (orjson's native output)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass
+    return json.dumps(data).encode("utf-8")
+
+
 def get_sdk_path():
     """Get the SDK path from preferences or auto-detect."""
     if bpy:
@@ -54,6 +121,28 @@ def get_sdk_path():
     return ""
 
 
+def get_compile_cache_dir(sdk_path=None):
+    """Directory for Node's on-disk compile cache, or "" without an SDK path.
+
+    sdk_path defaults to the SDK the runtime uses (get_sdk_path()).
+    """
+    if sdk_path is None:
+        sdk_path = get_sdk_path()
+    if not sdk_path:
+        return ""
+    return os.path.join(sdk_path, "cache", "node-compile-cache")
+
+
+def _node_env():
+    """Environment for spawned node processes: os.environ plus NODE_COMPILE_CACHE,
+    so modules loaded from disk (require/import) skip parsing on later runs."""
+    env = dict(os.environ)
+    cache_dir = get_compile_cache_dir()
+    if cache_dir and "NODE_COMPILE_CACHE" not in env:
+        env["NODE_COMPILE_CACHE"] = cache_dir
+    return env
+
+
 def get_node_path():
     """Get the path to Node.js executable from the SDK."""
     sdk_path = get_sdk_path()
@@ -94,32 +183,147 @@ def get_node_path():
     return None
 
 
+def _pump_lines(stream, lines):
+    """Copy lines from a worker pipe into a queue; None marks end of stream."""
+    try:
+        for line in stream:
+            lines.put(line)
+    except Exception:
+        pass
+    lines.put(None)
+
+
+_WORKER_DONE_MARKER = "___BGE_DONE___"
+
+# Scripts kept compiled in the persistent worker (all dropped when exceeded)
+_WORKER_SCRIPT_CACHE_SIZE = 64
+
+
+def _pump_responses(stream, responses):
+    """Collect worker stdout per request: queue (output, completion line) once
+    the completion line arrives, so the caller wakes up once per request
+    instead of once per line. (output, None) marks end of stream."""
+    lines = []
+    try:
+        for line in stream:
+            # Anywhere in the line: the script may have left a partial line on stdout
+            marker = line.find(_WORKER_DONE_MARKER)
+            if marker < 0:
+                lines.append(line)
+                continue
+            if marker:
+                lines.append(line[:marker])
+            responses.put(("".join(lines), line[marker:]))
+            lines = []
+    except Exception:
+        pass
+    responses.put(("".join(lines), None))
+
+
+def _read_into(fd, buf):
+    """Fill buf from a pipe fd (POSIX); False on end of stream."""
+    view = memoryview(buf)
+    got = 0
+    while got < len(buf):
+        n = os.readv(fd, [view[got:]])
+        if not n:
+            return False
+        got += n
+    return True
+
+
+def _pump_frames(fd, frames):
+    """Copy length-prefixed frames (4-byte LE length + payload) from a worker
+    pipe into a queue; None marks end of stream."""
+    header = bytearray(4)
+    try:
+        while _read_into(fd, header):
+            # Read straight into a buffer of the final size (no chunk joins);
+            # orjson/json parse bytearrays as they are
+            payload = bytearray(int.from_bytes(header, "little"))
+            if not _read_into(fd, payload):
+                break
+            frames.put(payload)
+    except Exception:
+        pass
+    frames.put(None)
+
+
 class NodeJSRuntime:
     """Wrapper for executing JavaScript code using Node.js."""
     
     def __init__(self, use_worker=False):
         self.node_path = get_node_path()
         self._interactive_context = {}  # Store for interactive console context
+        self._env = _node_env()  # resolved here: it reads preferences (main thread)
         self._use_worker = use_worker
         self._worker_process = None
         self._worker_stdin = None
         self._worker_stdout = None
+        self._worker_responses = None  # (stdout, completion line) per request from the reader thread
+        self._worker_errors = None  # stderr lines from the reader thread
+        self._worker_frame_fd = None  # read end of the commands pipe (POSIX only)
+        self._worker_frames = None  # command frames from the reader thread (None = EOF)
+        self._commands_frame = None  # commands payload of the last worker request
         self._worker_exec_id = 0
+        self._worker_lock = threading.Lock()
+        self._warm_up_cancelled = False  # set by stop_worker()
+        self._worker_scripts = {}  # user code -> script id compiled in the worker
+        # Request: one JSON line {"id", "script", "ctx"}, plus "source" (a JS
+        # function taking the context, compiled once as a vm.Script named after
+        # "file") the first time a script id is used and
+        # "reset" to drop previously compiled scripts. Completion: the code's own output,
+        # then "___BGE_DONE___<id>\t0", or "___BGE_DONE___<id>\t<1|2>\t<JSON error text>"
+        # on failure (stderr is read by another thread and may lag): 1 = the user
+        # script threw, 2 = the script isn't compiled in the worker (send it again).
+        # With BGE_CMDS_FD set, the bridge hands its commands to __bgeSendCommands
+        # and one frame (4-byte LE length + JSON, empty if none) is written to
+        # that fd per request, before the completion line.
         self._worker_bootstrap = r"""
 (function(){
   const readline = require('readline');
+  const fs = require('fs');
+  const vm = require('vm');
+  const framesFd = process.env.BGE_CMDS_FD ? Number(process.env.BGE_CMDS_FD) : -1;
+  if (framesFd >= 0) {
+    globalThis.__bgeSendCommands = function(cmds) { globalThis.__bgeFrame = JSON.stringify(cmds); };
+  }
+  const scripts = new Map();
   const rl = readline.createInterface({ input: process.stdin });
   rl.on('line', function(line) {
+    let id = '';
+    let compiled = false;
+    globalThis.__bgeFailed = false;
+    globalThis.__bgeError = '';
+    globalThis.__bgeFrame = '';
     try {
       const msg = JSON.parse(line);
-      const id = msg.id || '';
-      eval(msg.code);
-      console.log('___BGE_CMDS___' + id + '\t' + JSON.stringify(typeof __bgeCommands !== 'undefined' ? __bgeCommands : []));
+      id = msg.id || '';
+      if (msg.reset) scripts.clear();
+      let run = scripts.get(msg.script);
+      if (msg.source !== undefined) {
+        // Compiled once per script; later requests only send the context
+        run = new vm.Script(msg.source, { filename: msg.file || 'bge-controller.js' }).runInThisContext();
+        scripts.set(msg.script, run);
+      }
+      if (run === undefined) throw new Error('Unknown script ' + msg.script);
+      compiled = true;
+      run(msg.ctx);
     } catch (e) {
       console.error(e.message || e);
-      console.log('___BGE_CMDS___' + id + '\t[]');
+      globalThis.__bgeError = String(e.message || e);
+      globalThis.__bgeFailed = true;
     }
+    if (framesFd >= 0) {
+      const body = Buffer.from(globalThis.__bgeFrame || '', 'utf8');
+      const header = Buffer.alloc(4);
+      header.writeUInt32LE(body.length, 0);
+      fs.writeSync(framesFd, Buffer.concat([header, body]));
+    }
+    console.log('___BGE_DONE___' + id + '\t' +
+      (globalThis.__bgeFailed ? (compiled ? '1' : '2') + '\t' + JSON.stringify(globalThis.__bgeError || '') : '0'));
   });
+  rl.on('close', function() { process.exit(0); });
 })();
 """
     
@@ -275,93 +479,224 @@ try {{
         node_path = self.get_node_path()
         if not node_path:
             return False
+        frame_fds = None
+        self._worker_scripts = {}
         try:
+            popen_kwargs = {"env": self._env}
+            if os.name != "nt":
+                # Commands come back on their own pipe, so they never have to be
+                # searched for in the script's stdout (pass_fds isn't on Windows)
+                frame_fds = os.pipe()
+                env = dict(self._env)
+                env["BGE_CMDS_FD"] = str(frame_fds[1])
+                popen_kwargs = {"pass_fds": (frame_fds[1],), "env": env}
             self._worker_process = subprocess.Popen(
                 [node_path, "-e", self._worker_bootstrap],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
+                **popen_kwargs
             )
+            # stdin stays binary: requests are written as the encoder's UTF-8
+            # bytes, with no str round-trip; Node's output is read as UTF-8 text
             self._worker_stdin = self._worker_process.stdin
-            self._worker_stdout = self._worker_process.stdout
+            self._worker_stdout = io.TextIOWrapper(self._worker_process.stdout, encoding="utf-8", errors="replace")
+            worker_stderr = io.TextIOWrapper(self._worker_process.stderr, encoding="utf-8", errors="replace")
+            # Pipes are read on threads so a request can wait with a timeout
+            # (select() doesn't work on pipes on Windows) and stderr never fills up
+            self._worker_responses = queue.SimpleQueue()
+            self._worker_errors = queue.SimpleQueue()
+            threading.Thread(target=_pump_responses, args=(self._worker_stdout, self._worker_responses), daemon=True).start()
+            threading.Thread(target=_pump_lines, args=(worker_stderr, self._worker_errors), daemon=True).start()
+            if frame_fds is not None:
+                os.close(frame_fds[1])  # the worker holds the write end
+                self._worker_frame_fd = frame_fds[0]
+                self._worker_frames = queue.SimpleQueue()
+                threading.Thread(target=_pump_frames, args=(frame_fds[0], self._worker_frames), daemon=True).start()
             return True
         except Exception:
+            if frame_fds is not None:
+                for fd in frame_fds:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
             self._worker_process = None
             self._worker_stdin = None
             self._worker_stdout = None
             return False
 
-    def _worker_execute(self, wrapped_code, timeout=10):
-        """Send code to worker and read response. Returns (output, error_output, success)."""
-        if not self._ensure_worker():
-            return ("", "Worker failed to start", False)
-        self._worker_exec_id += 1
-        req_id = str(self._worker_exec_id)
+    def warm_up(self):
+        """Start the persistent worker and run an empty bridge script, so the
+        first controller tick doesn't pay for Node startup. Blocks; call it
+        from a background thread."""
+        if not self._use_worker:
+            return False
+        with self._worker_lock:
+            # stop_worker() ran first; don't start a worker nobody will stop
+            if self._warm_up_cancelled:
+                return False
+            if not self._ensure_worker():
+                return False
+            _output, _errors, success = self._worker_request("", {}, 10)
+        _node_log("Node worker warm-up success=%s" % success)
+        return success
+
+    def stop_worker(self):
+        """Stop the persistent Node worker, waiting for a request or warm-up in
+        flight, and cancel a warm-up that hasn't started yet."""
+        with self._worker_lock:
+            self._warm_up_cancelled = True
+            self._stop_worker()
+
+    def _stop_worker(self):
+        """Stop the worker (it exits when its stdin closes); caller holds _worker_lock."""
+        process = self._worker_process
+        self._worker_process = None
+        self._worker_stdin = None
+        self._worker_stdout = None
+        frame_fd = self._worker_frame_fd
+        self._worker_frame_fd = None
+        self._worker_frames = None
+        if process is None:
+            return
         try:
-            import json as _json
-            msg = {"id": req_id, "code": wrapped_code}
-            line = _json.dumps(msg) + "\n"
-            self._worker_stdin.write(line)
-            self._worker_stdin.flush()
-        except Exception as e:
-            self._worker_process = None
-            return ("", str(e), False)
-        marker = "___BGE_CMDS___"
-        output_lines = []
-        end_time = __import__("time").time() + timeout
-        while __import__("time").time() < end_time:
+            process.stdin.close()
+            process.wait(timeout=1)
+        except Exception:
             try:
-                line_out = self._worker_stdout.readline()
+                process.kill()
             except Exception:
-                break
-            if not line_out:
-                break
-            output_lines.append(line_out)
-            if marker in line_out and (marker + req_id) in line_out:
-                break
-        output = "".join(output_lines)
-        return (output, "", True)
+                pass
+        if frame_fd is not None:
+            try:
+                os.close(frame_fd)
+            except OSError:
+                pass
 
-    def execute_with_context(self, code, context=None, timeout=10):
-        """
-        Execute JavaScript code using Node.js with BGE bridge context.
+    def take_commands_frame(self):
+        """Return the commands JSON (bytearray, empty if none) sent over the commands
+        pipe by the last worker request, or None if it didn't use one."""
+        frame = self._commands_frame
+        self._commands_frame = None
+        return frame
 
-        The code is wrapped so that:
-        - A global __BGE_CONTEXT__ object is available in JS.
-        - A global `bge` object is created that queues high-level commands
-          into an array.
-        - At the end, the commands array is printed as a single line starting
-          with the marker '___BGE_CMDS___'.
+    def _worker_stderr(self):
+        """Return the stderr text the worker produced since the last call."""
+        errors = []
+        try:
+            while True:
+                line = self._worker_errors.get_nowait()
+                if line is not None:
+                    errors.append(line)
+        except queue.Empty:
+            pass
+        return "".join(errors)
+
+    def _worker_execute(self, code, context, timeout=10, filename=None):
+        """Run user code with the bridge in the worker and read the response.
 
         Returns (output, error_output, success).
         """
-        import json
-
-        node_path = self.get_node_path()
-        _node_log("Node execute_with_context code_len=%s node_path=%s" % (len(code or ""), node_path or "NOT FOUND"))
-        if not node_path:
-            return ("", "Error: Node.js not found. Please install Node.js or configure SDK path.", False)
+        # One request at a time: responses are matched to the request in flight
+        with self._worker_lock:
+            return self._worker_request(code, context, timeout, filename)
 
-        # Prepare context JSON that will be injected into the JS runtime
-        context = context or {}
+    def _worker_request(self, code, context, timeout, filename=None):
+        if not self._ensure_worker():
+            return ("", "Worker failed to start", False)
+        self._worker_exec_id += 1
+        req_id = str(self._worker_exec_id)
+        self._commands_frame = None
+        self._worker_stderr()  # drop leftovers from earlier requests
+        request = {"id": req_id, "ctx": context}
+        script_id = self._worker_scripts.get(code)
+        if script_id is None:
+            if len(self._worker_scripts) >= _WORKER_SCRIPT_CACHE_SIZE:
+                self._worker_scripts.clear()
+                request["reset"] = True
+            script_id = "s" + req_id
+            request["source"] = "(function(__bgeCtx) {\n" + self._bridge_code(code, "__bgeCtx") + "\n})"
+            if filename:
+                request["file"] = filename
+            self._worker_scripts[code] = script_id
+        request["script"] = script_id
         try:
-            context_json = json.dumps(context)
-        except Exception:
-            context_json = "{}"
+            try:
+                line = _dumps_json_bytes(request) + b"\n"
+            except Exception:
+                request["ctx"] = {}
+                line = _dumps_json_bytes(request) + b"\n"
+            self._worker_stdin.write(line)
+            self._worker_stdin.flush()
+        except Exception as e:
+            self._stop_worker()
+            return ("", str(e), False)
+        done = _WORKER_DONE_MARKER + req_id + "\t"
+        output_parts = []
+        deadline = time.monotonic() + timeout
+        while True:
+            # Return as soon as this request's completion line arrives
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # The worker is stuck in user code; restart it on the next request
+                self._stop_worker()
+                return ("".join(output_parts), "Error: JavaScript execution timed out.", False)
+            try:
+                output, line_out = self._worker_responses.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            output_parts.append(output)
+            if line_out is None:
+                # Worker exited (e.g. the script called process.exit())
+                self._stop_worker()
+                return ("".join(output_parts), self._worker_stderr() or "Node worker exited", False)
+            if line_out.startswith(done):
+                status = line_out[len(done):].rstrip("\r\n")
+                failed = status[:1] != "0"
+                frames = self._worker_frames
+                if frames is not None:
+                    # Written before the completion line, so it's already on its way
+                    try:
+                        frame = frames.get(timeout=max(deadline - time.monotonic(), 0.1))
+                    except queue.Empty:
+                        frame = None
+                    if frame is None:
+                        # Out of sync with the worker; start a fresh one next time
+                        self._stop_worker()
+                    self._commands_frame = frame
+                error_output = self._worker_stderr()
+                if failed:
+                    if status[:1] == "2":
+                        # Not compiled in the worker; send the source again next time
+                        self._worker_scripts.pop(code, None)
+                    # The error travels with the completion line; its stderr
+                    # copy may not have been read yet
+                    try:
+                        error_output = json.loads(status[2:]) or error_output
+                    except ValueError:
+                        pass
+                    if not error_output:
+                        error_output = "Unknown JavaScript execution error"
+                return ("".join(output_parts), error_output, not failed)
 
-        try:
-            # Escape the user code for safe embedding inside a JS function body.
-            # Aqui usamos uma função IIFE para executar o código do usuário.
-            # Importante: NÃO escapamos crases/backticks (`) para permitir
-            # o uso de template literals normalmente.
-            user_code = code.replace("\\", "\\\\")
+    def _bridge_code(self, code, context_expr):
+        """Wrap user code with the BGE bridge; context_expr is the JS expression
+        for the context (inline JSON, or the worker's function argument)."""
+        # Escape the user code for safe embedding inside a JS function body.
+        # Aqui usamos uma função IIFE para executar o código do usuário.
+        # Importante: NÃO escapamos crases/backticks (`) para permitir
+        # o uso de template literals normalmente.
+        user_code = code.replace("\\", "\\\\")
 
-            wrapped_code = f"""
-const __BGE_CONTEXT__ = {context_json} || {{}};
+        return f"""
+const __BGE_CONTEXT__ = {context_expr} || {{}};
 let __bgeCommands = [];
+const __BGE_OP_IDS = {_BRIDGE_OP_IDS_JSON};
 function __bgeQueue(cmd) {{
+    // Send ops as small integer ids (see BRIDGE_OPS)
+    const opId = __BGE_OP_IDS[cmd.op];
+    if (opId) cmd.op = opId;
     __bgeCommands.push(cmd);
 }}
 
@@ -492,12 +827,13 @@ function __bgeMakeGameObject(name) {{
         get lastRayCastResult() {{
             const ctx = __BGE_CONTEXT__ || {{}};
             const results = ctx.rayCastResults || {{}};
+            // [object name, point, normal] (see script_handler._raycast_results)
             const r = results[objName];
             if (!r) return {{ object: null, point: null, normal: null }};
             return {{
-                object: r.object ? __bgeMakeGameObject(r.object) : null,
-                point: Array.isArray(r.point) ? r.point.slice() : null,
-                normal: Array.isArray(r.normal) ? r.normal.slice() : null,
+                object: r[0] ? __bgeMakeGameObject(r[0]) : null,
+                point: Array.isArray(r[1]) ? r[1].slice() : null,
+                normal: Array.isArray(r[2]) ? r[2].slice() : null,
             }};
         }},
         setViewport(left, bottom, right, top) {{
@@ -791,7 +1127,10 @@ global.bge = bge;
     }}
 }})();
 
-// Execute user code in an IIFE to avoid leaking globals
+// Execute user code in an IIFE to avoid leaking globals.
+// On error: no commands are sent and the run is marked failed (exit code 1 for
+// a one-shot process, __bgeFailed for the persistent worker, which must not exit).
+globalThis.__bgeFailed = false;
 (function() {{
     try {{
         (function() {{
@@ -802,43 +1141,88 @@ global.bge = bge;
         if (e.stack) {{
             console.error(e.stack);
         }}
-        process.exit(1);
+        globalThis.__bgeError = e.stack || e.toString();
+        globalThis.__bgeFailed = true;
+        process.exitCode = 1;
     }}
 }})();
 
-// DEBUG: log commands count before sending
-console.log("[UPBGE-JS] DEBUG __bgeCommands.length=" + (typeof __bgeCommands !== 'undefined' ? __bgeCommands.length : 'undefined'));
+if (!globalThis.__bgeFailed) {{
+    // DEBUG: log commands count before sending
+    console.log("[UPBGE-JS] DEBUG __bgeCommands.length=" + (typeof __bgeCommands !== 'undefined' ? __bgeCommands.length : 'undefined'));
 
-// After user code finishes, emit the queued commands as a single line
-try {{
-    // Marker used by the Python side to extract commands
-    console.log("___BGE_CMDS___" + JSON.stringify(__bgeCommands));
-}} catch (e) {{
-    console.error("Failed to serialize BGE commands: " + e.toString());
+    // After user code finishes, emit the queued commands as a single line
+    try {{
+        if (typeof globalThis.__bgeSendCommands === 'function') {{
+            // Persistent worker: commands go out on the commands pipe
+            globalThis.__bgeSendCommands(__bgeCommands);
+        }} else {{
+            // Marker used by the Python side to extract commands
+            console.log("___BGE_CMDS___" + JSON.stringify(__bgeCommands));
+        }}
+    }} catch (e) {{
+        console.error("Failed to serialize BGE commands: " + e.toString());
+    }}
 }}
 """
 
+    def execute_with_context(self, code, context=None, timeout=10, raw_output=False, filename=None):
+        """
+        Execute JavaScript code using Node.js with BGE bridge context.
+
+        The code is wrapped so that:
+        - A global __BGE_CONTEXT__ object is available in JS.
+        - A global `bge` object is created that queues high-level commands
+          into an array.
+        - At the end, the commands array is printed as a single line starting
+          with the marker '___BGE_CMDS___'.
+
+        filename only names the compiled script in stack traces (persistent worker).
+
+        Returns (output, error_output, success). With raw_output=True the
+        subprocess stdout is returned undecoded as bytes (the persistent worker
+        always returns str); error_output is always str.
+        """
+        node_path = self.get_node_path()
+        _node_log("Node execute_with_context code_len=%s node_path=%s" % (len(code or ""), node_path or "NOT FOUND"))
+        if not node_path:
+            return ("", "Error: Node.js not found. Please install Node.js or configure SDK path.", False)
+
+        context = context or {}
+
+        try:
             if self._use_worker:
-                output, error_output, success = self._worker_execute(wrapped_code, timeout=timeout)
-                _node_log("Node worker done success=%s output_len=%s has_marker=%s" % (
-                    success, len(output or ""), "___BGE_CMDS___" in (output or "")))
+                output, error_output, success = self._worker_execute(code, context, timeout=timeout, filename=filename)
+                _node_log("Node worker done success=%s output_len=%s has_commands=%s" % (
+                    success, len(output or ""),
+                    bool(self._commands_frame) or "___BGE_CMDS___" in (output or "")))
                 return (output, error_output, success)
 
+            # Prepare context JSON that will be injected into the JS runtime
+            try:
+                context_json = _dumps_json(context)
+            except Exception:
+                context_json = "{}"
+            wrapped_code = self._bridge_code(code, context_json)
+
             result = subprocess.run(
                 [node_path, "-e", wrapped_code],
                 capture_output=True,
-                text=True,
+                text=not raw_output,
                 timeout=timeout,
+                env=self._env,
             )
 
             output = result.stdout
             error_output = result.stderr
-            _node_log("Node subprocess done returncode=%s output_len=%s has_marker=%s" % (
-                result.returncode, len(output or ""), "___BGE_CMDS___" in (output or "")))
+            if raw_output:
+                error_output = error_output.decode("utf-8", "replace")
+            _node_log("Node subprocess done returncode=%s output_len=%s" % (
+                result.returncode, len(output or "")))
 
             if result.returncode != 0:
                 if not error_output:
-                    error_output = output
+                    error_output = output.decode("utf-8", "replace") if raw_output else output
                 return (output, error_output, False)
 
             return (output, error_output, True)
@@ -867,6 +1251,7 @@ try {{
                 capture_output=True,
                 text=True,
                 timeout=timeout,
+                env=self._env,
             )
             
             output = result.stdout
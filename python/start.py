@@ -6,14 +6,12 @@
 
 import sys
 import os
+import traceback
 import bpy
 
 
 def register(local_sdk=False):
     """Register all SDK components."""
-    import sys
-    import os
-    
     # Get the directory where this file is located (python/)
     # This allows imports to work whether start.py is imported as a module or directly
     start_dir = os.path.dirname(os.path.abspath(__file__))
@@ -28,7 +26,6 @@ def register(local_sdk=False):
         print("UPBGE JavaScript SDK: Console modules registered")
     except Exception as e:
         print(f"UPBGE JavaScript SDK: Failed to register console modules: {e}")
-        import traceback
         traceback.print_exc()
     
     try:
@@ -38,11 +35,10 @@ def register(local_sdk=False):
         print("UPBGE JavaScript SDK: Game engine modules registered")
     except Exception as e:
         print(f"UPBGE JavaScript SDK: Failed to register game engine modules: {e}")
-        import traceback
         traceback.print_exc()
     
     # Verify console modules are registered
-    console_modules = ['_console_javascript', 'console_javascript']
+    console_modules = ['console_javascript']
     registered = [mod for mod in console_modules if mod in sys.modules]
     if registered:
         print(f"UPBGE JavaScript SDK: Console modules in sys.modules: {registered}")